@@ -4,22 +4,25 @@ from typing import Optional, Union, List
 from urllib.parse import urlencode
 
 import hashlib
+import hmac
 
 
 class AsyncAaio(RequestsClient):
     API_HOST: str = "https://aaio.so"
 
-    def __init__(self, apikey: str, shopid: str, secretkey: str) -> None:
+    def __init__(self, apikey: str, shopid: str, secretkey: str, secretkey2: Optional[str] = None) -> None:
         '''
         Initialize Aaio API client
         :param apikey: Your API Key
         :param shopid: Your Shop ID
         :param secretkey: Your Secretkey №1
+        :param secretkey2: Optional. Your Secretkey №2, needed only to check payment notifications.
         '''
         super().__init__()
         self.__api_key = apikey
         self.__shop_id = shopid
         self.__secret_key = secretkey
+        self.__secret_key2 = secretkey2
         self.__headers = {
             "Accept": "application/json",
             "X-Api-Key": self.__api_key
@@ -40,6 +43,80 @@ class AsyncAaio(RequestsClient):
 
         return hashlib.sha256(params_for_sing.encode('utf-8')).hexdigest()
 
+    def check_webhook_signature(self, data: dict) -> bool:
+        """Check the sign field of a payment notification.
+
+        :param data: Notification form fields.
+        :return: True if the notification was sent by Aaio for your shop."""
+        if not self.__secret_key2:
+            raise ValueError('No SecretKey №2 specified')
+        params_for_sing = ':'.join(map(
+            str,
+            [data.get("merchant_id"), data.get("amount"), data.get("currency"), self.__secret_key2, data.get("order_id")])
+        )
+        expected = hashlib.sha256(params_for_sing.encode('utf-8')).hexdigest()
+        return str(data.get("merchant_id")) == str(self.__shop_id) and \
+            hmac.compare_digest(expected, str(data.get("sign") or ""))
+
+    def __payment_params(
+            self,
+            amount: float,
+            order_id: Union[int, str],
+            currency: str,
+            method: Optional[str],
+            desc: Optional[str],
+            email: Optional[str],
+            lang: Optional[str],
+            referal: Optional[str],
+            us_key: Optional[str],
+    ) -> dict:
+        params = {
+            'merchant_id': self.__shop_id,
+            'amount': amount,
+            'order_id': order_id,
+            'currency': currency,
+            'method': method,
+            'desc': desc,
+            'email': email,
+            'lang': lang,
+            'referal': referal,
+            'us_key': us_key,
+            'sign': self.__create_sign(amount, currency, order_id),
+        }
+
+        self._delete_empty_fields(params)
+        return params
+
+    def get_payment_url(
+            self,
+            amount: float,
+            order_id: Union[int, str],
+            currency: Optional[str] = 'RUB',
+            method: Optional[str] = None,
+            desc: Optional[str] = None,
+            email: Optional[str] = None,
+            lang: Optional[str] = None,
+            referal: Optional[str] = None,
+            us_key: Optional[str] = None,
+    ) -> str:
+
+        """Generate payment url locally, without a request to Aaio. Gives the same url as create_payment_url().
+
+        Docs: https://wiki.aaio.so/priem-platezhei/sozdanie-zakaza
+
+        :param amount: Order amount.
+        :param order_id: Order number, which unique in your system, up to 16 characters, without spaces (aA-zZ, 0-9, :, -, _, [, ] , |)
+        :param currency: Currency. Default to 'RUB' (RUB, UAH, EUR, USD)
+        :param method: Payment Aaio system code name
+        :param desc: Order description
+        :param email: Buyer mail
+        :param lang: Interface language. Default to 'ru' (ru, en)
+        :param referal: Referral code
+        :param us_key: Parameter that you want to get in the notification"""
+
+        params = self.__payment_params(amount, order_id, currency, method, desc, email, lang, referal, us_key)
+        return f"{self.API_HOST}/merchant/pay?" + urlencode(params)
+
     async def create_payment_url(
             self,
             amount: float,
@@ -51,6 +128,7 @@ class AsyncAaio(RequestsClient):
             lang: Optional[str] = None,
             referal: Optional[str] = None,
             us_key: Optional[str] = None,
+            local: Optional[bool] = False,
     ) -> str:
 
         """Generate payment url.
@@ -65,23 +143,13 @@ class AsyncAaio(RequestsClient):
         :param email: Buyer mail
         :param lang: Interface language. Default to 'ru' (ru, en)
         :param referal: Referral code
-        :param us_key: Parameter that you want to get in the notification"""
+        :param us_key: Parameter that you want to get in the notification
+        :param local: Optional. If True: the url is built locally, see get_payment_url(). Default to False"""
 
-        params = {
-            'merchant_id': self.__shop_id,
-            'amount': amount,
-            'order_id': order_id,
-            'currency': currency,
-            'method': method,
-            'desc': desc,
-            'email': email,
-            'lang': lang,
-            'referal': referal,
-            'us_key': us_key,
-            'sign': self.__create_sign(amount, currency, order_id),
-        }
+        if local:
+            return self.get_payment_url(amount, order_id, currency, method, desc, email, lang, referal, us_key)
 
-        self._delete_empty_fields(params)
+        params = self.__payment_params(amount, order_id, currency, method, desc, email, lang, referal, us_key)
         
         headers = self.__headers
         headers["Content-Type"] = "application/x-www-form-urlencoded"
@@ -142,8 +210,8 @@ class AsyncAaio(RequestsClient):
         response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers)
 
         if method is not None:
-            return WithdrawalMethod(**response['list'][method])
-        return [WithdrawalMethod(**method) for method in response["list"].values()]
+            return WithdrawalMethod(code=method, **response['list'][method])
+        return [WithdrawalMethod(code=code, **method) for code, method in response["list"].items()]
 
     async def get_order_methods(self,
                            method: Optional[str] = None
@@ -168,8 +236,8 @@ class AsyncAaio(RequestsClient):
         response = await self._request(self.__payment_name, self.__post_method, url, data=params, headers=self.__headers)
 
         if method is not None:
-            return OrderMethod.model_validate(response['list'][method])
-        return [OrderMethod(**method) for method in response["list"].values()]
+            return OrderMethod.model_validate({"code": method, **response['list'][method]})
+        return [OrderMethod(code=code, **method) for code, method in response["list"].items()]
 
     async def get_withdrawal_info(self,
                                 my_id: Union[int, str],
@@ -34,6 +34,7 @@ class OrderMethodCurrencies(BaseModel):
     EUR: Optional[float] = None
 
 class OrderMethod(BaseModel):
+    code: Optional[str] = None
     name: Optional[str] = None
     min: Optional[OrderMethodCurrencies] = None
     max: Optional[OrderMethodCurrencies] = None
@@ -54,6 +55,7 @@ class Withdrawal(BaseModel):
     complete_date: Optional[str] = None
 
 class WithdrawalMethod(BaseModel):
+    code: Optional[str] = None
     name: Optional[str] = None
     min: Optional[float] = None
     max: Optional[float] = None
@@ -72,4 +74,21 @@ class CreateWithdrawalInfo(BaseModel):
     amount_down: Optional[float] = None
     commission: Optional[float] = None
     commission_type: Optional[int] = None
-    status: Optional[str] = None
\ No newline at end of file
+    status: Optional[str] = None
+
+
+class Notification(BaseModel):
+    merchant_id: Optional[str] = None
+    invoice_id: Optional[str] = None
+    order_id: Optional[str] = None
+    amount: Optional[Union[float, str]] = None
+    currency: Optional[str] = None
+    profit: Optional[Union[float, str]] = None
+    commission: Optional[Union[float, str]] = None
+    commission_client: Optional[Union[float, str]] = None
+    commission_type: Optional[str] = None
+    sign: Optional[str] = None
+    method: Optional[str] = None
+    desc: Optional[str] = None
+    email: Optional[str] = None
+    us_key: Optional[str] = None
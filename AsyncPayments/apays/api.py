@@ -2,6 +2,7 @@ from ..requests import RequestsClient
 from typing import Optional, Union
 from .models import Order, OrderInfo
 import hashlib
+import hmac
 
 
 class AsyncAPays(RequestsClient):
@@ -33,6 +34,16 @@ class AsyncAPays(RequestsClient):
             
         return hashlib.md5(data.encode()).hexdigest()
 
+    def check_webhook_signature(self, order_id: str, status: str, sign: str) -> bool:
+        """Check the sign field of a callback.
+
+        :param order_id: Order ID from the callback.
+        :param status: Order status from the callback.
+        :param sign: Signature from the callback.
+        :return: True if the callback was sent by APays."""
+        expected = hashlib.md5(f"{order_id}:{status}:{self.__secret_key}".encode()).hexdigest()
+        return hmac.compare_digest(expected, sign or "")
+
     async def create_order(
         self,
         order_id: str,
@@ -16,4 +16,10 @@ class Order(BaseModel):
     
 class OrderInfo(BaseModel):
     status: Optional[bool] = None
-    order_status: Optional[str] = None
\ No newline at end of file
+    order_status: Optional[str] = None
+
+
+class Callback(BaseModel):
+    order_id: Optional[str] = None
+    status: Optional[str] = None
+    sign: Optional[str] = None
@@ -0,0 +1,5 @@
+from .runner import BatchRunner
+from .invoices import InvoiceBatch
+from .crystalpay import CrystalPayPipeline
+from .payouts import MassPayout
+from .models import BatchResult, BatchPolicies, BatchStatuses, CrystalPayOperations
@@ -0,0 +1,43 @@
+from ..crystalPay import AsyncCrystalPay
+from .models import BatchResult, BatchPolicies, BatchStatuses, CrystalPayOperations
+from .runner import BatchRunner
+from typing import Optional
+
+
+class CrystalPayPipeline(BatchRunner):
+
+    def __init__(self, client: AsyncCrystalPay, operation: str, concurrency: Optional[int] = 10,
+                 rate: Optional[float] = None, policy: Optional[str] = BatchPolicies.CONTINUE) -> None:
+        """
+        Run many CrystalPay payoffs, swaps or transfers, each created and submitted as soon as it is created.
+
+        Items go through their create and submit stages independently, so up to concurrency items are in
+        flight in either stage. The result of an item is the submit response. If the submit stage fails,
+        the create response is kept in BatchResult.created, so the item can be submitted or cancelled later.
+
+        :param client: AsyncCrystalPay.
+        :param operation: One of CrystalPayOperations: payoff (create_payoff, submit_payoff), swap (create_swap, swap_submit) or transfer (create_transfer, submit_transfer).
+        :param concurrency: Optional. Maximum number of items in flight. Default is 10.
+        :param rate: Optional. Maximum requests per second, both stages included. Default is None (no limit).
+        :param policy: Optional. One of BatchPolicies. Default is continue.
+        """
+        super().__init__(concurrency, rate, policy)
+        stages = {
+            CrystalPayOperations.PAYOFF: (client.create_payoff, client.submit_payoff),
+            CrystalPayOperations.SWAP: (client.create_swap, client.swap_submit),
+            CrystalPayOperations.TRANSFER: (client.create_transfer, client.submit_transfer),
+        }
+        if operation not in stages:
+            raise ValueError(f'Unknown CrystalPay operation {operation}')
+        self.__create, self.__submit = stages[operation]
+
+    async def _process(self, index: int, spec: dict) -> BatchResult:
+        try:
+            created = await self._call(self.__create, **spec)
+        except Exception as error:
+            return BatchResult(index, spec, BatchStatuses.FAILED, error=error)
+        try:
+            result = await self._call(self.__submit, created.id)
+        except Exception as error:
+            return BatchResult(index, spec, BatchStatuses.FAILED, error=error, created=created)
+        return BatchResult(index, spec, BatchStatuses.SUCCESS, result, created=created)
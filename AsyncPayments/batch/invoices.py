@@ -0,0 +1,50 @@
+from ..cryptoBot import AsyncCryptoBot
+from ..cryptomus import AsyncCryptomus
+from ..crystalPay import AsyncCrystalPay
+from ..xrocket import AsyncXRocket
+from .models import BatchResult, BatchPolicies, BatchStatuses
+from .runner import BatchRunner
+from typing import Optional, Any, Iterable, AsyncIterator, Callable, Awaitable
+
+
+class InvoiceBatch(BatchRunner):
+
+    def __init__(self, client: Any, concurrency: Optional[int] = 10, rate: Optional[float] = None,
+                 policy: Optional[str] = BatchPolicies.CONTINUE) -> None:
+        """
+        Create many invoices with at most concurrency requests in flight.
+
+        Results are streamed in input order while later invoices are still being created. With the stop
+        policy the first failure stops the batch: requests already sent are finished and reported, the
+        rest are reported as skipped.
+
+        :param client: AsyncCryptoBot, AsyncXRocket (create_invoice), AsyncCryptomus or AsyncCrystalPay (create_payment).
+        :param concurrency: Optional. Maximum number of requests in flight. Default is 10.
+        :param rate: Optional. Maximum requests per second. Default is None (no limit).
+        :param policy: Optional. One of BatchPolicies. Default is continue.
+        """
+        super().__init__(concurrency, rate, policy)
+        self.__create = self.__method(client)
+
+    @staticmethod
+    def __method(client: Any) -> Callable[..., Awaitable]:
+        if isinstance(client, (AsyncCryptoBot, AsyncXRocket)):
+            return client.create_invoice
+        if isinstance(client, (AsyncCryptomus, AsyncCrystalPay)):
+            return client.create_payment
+        raise ValueError(f'Batch invoices are not supported for {type(client).__name__}')
+
+    async def _process(self, index: int, spec: dict) -> BatchResult:
+        try:
+            result = await self._call(self.__create, **spec)
+        except Exception as error:
+            return BatchResult(index, spec, BatchStatuses.FAILED, error=error)
+        return BatchResult(index, spec, BatchStatuses.SUCCESS, result)
+
+    def create(self, specs: Iterable[dict]) -> AsyncIterator[BatchResult]:
+        """Create invoices and yield their results in input order.
+
+        Example: async for item in batch.create({"amount": 5, "asset": "USDT"} for _ in range(1000)): ...
+
+        :param specs: Keyword arguments of create_invoice or create_payment, one dict per invoice. Read lazily, so a generator works for large batches."""
+        return self.stream(specs)
@@ -0,0 +1,44 @@
+from typing import Optional, Any
+
+
+class BatchPolicies:
+    CONTINUE: str = "continue"
+    STOP: str = "stop"
+
+
+class CrystalPayOperations:
+    PAYOFF: str = "payoff"
+    SWAP: str = "swap"
+    TRANSFER: str = "transfer"
+
+
+class BatchStatuses:
+    SUCCESS: str = "success"
+    FAILED: str = "failed"
+    SKIPPED: str = "skipped"
+
+
+class BatchResult:
+
+    def __init__(self, index: int, spec: dict, status: str, result: Optional[Any] = None,
+                 error: Optional[Exception] = None, created: Optional[Any] = None) -> None:
+        """
+        Result of one item of a batch.
+
+        :param index: Position of the item in the input.
+        :param spec: Keyword arguments the item was created with.
+        :param status: One of BatchStatuses.
+        :param result: Optional. Object returned by the provider.
+        :param error: Optional. Exception raised by the provider.
+        :param created: Optional. Object returned by the create stage of a two-stage item, kept when the submit stage fails.
+        """
+        self.index = index
+        self.spec = spec
+        self.status = status
+        self.result = result
+        self.error = error
+        self.created = created
+
+    @property
+    def ok(self) -> bool:
+        return self.status == BatchStatuses.SUCCESS
@@ -0,0 +1,149 @@
+from ..cryptoBot import AsyncCryptoBot
+from ..cryptomus import AsyncCryptomus
+from ..cryptomus.models import PayoutStatuses
+from ..xrocket import AsyncXRocket
+from ..requests import is_transient
+from .models import BatchResult, BatchPolicies, BatchStatuses
+from .runner import BatchRunner
+from typing import Optional, Union, Any, List, Iterable, Callable, Awaitable
+
+import asyncio
+import hashlib
+
+
+class MassPayout(BatchRunner):
+
+    def __init__(self, client: Union[AsyncCryptomus, AsyncCryptoBot, AsyncXRocket], batch_id: str,
+                 withdrawal: Optional[bool] = False, concurrency: Optional[int] = 10, rate: Optional[float] = None,
+                 retries: Optional[int] = 3, retry_delay: Optional[float] = 1.0,
+                 policy: Optional[str] = BatchPolicies.CONTINUE) -> None:
+        """
+        Pay out to many recipients with idempotency keys, retries and batched confirmation.
+
+        Every payout gets a key derived from batch_id and the recipient: Cryptomus order_id (create_payout,
+        recipient address), CryptoBot spend_id (transfer, recipient user_id) or XRocket transferId (transfer,
+        recipient tgUserId) or withdrawalId (withdrawal, recipient address). Running the same batch again,
+        for example after a crash, sends the same keys, so the provider does not pay anyone twice. Pass the
+        key field in a spec yourself to pay one recipient several times in a batch.
+
+        Network errors, timeouts, 5xx and 429 responses are retried with the same key. Other errors, for
+        example a 4xx rejection because of insufficient funds, fail the item at once.
+
+        :param client: AsyncCryptomus, AsyncCryptoBot or AsyncXRocket.
+        :param batch_id: Stable ID of the payout batch in your system.
+        :param withdrawal: Optional. Use XRocket withdrawal instead of transfer. Default is False.
+        :param concurrency: Optional. Maximum number of payouts in flight. Default is 10.
+        :param rate: Optional. Maximum requests per second. Default is None (no limit).
+        :param retries: Optional. Retries of a payout after a network error, a timeout or a 5xx response. Default is 3.
+        :param retry_delay: Optional. Pause before the first retry in seconds, doubled on every next one. Default is 1.
+        :param policy: Optional. One of BatchPolicies. Default is continue.
+        """
+        super().__init__(concurrency, rate, policy)
+        self.__client = client
+        self.__batch_id = batch_id
+        self.__retries = retries
+        self.__retry_delay = retry_delay
+        self.__lookup: Optional[Callable[[str], Awaitable]] = None
+        # Final statuses of a payout: paid and rejected.
+        self.__paid, self.__rejected = (), ()
+        if isinstance(client, AsyncCryptomus):
+            self.__send, self.__key_field, self.__recipient_field = client.create_payout, "order_id", "address"
+            self.__lookup = lambda key: client.payout_info(order_id=key)
+            self.__paid = (PayoutStatuses.PAID,)
+            self.__rejected = (PayoutStatuses.FAIL, PayoutStatuses.CANCEL, PayoutStatuses.SYSTEM_FAIL)
+        elif isinstance(client, AsyncCryptoBot):
+            self.__send, self.__key_field, self.__recipient_field = client.transfer, "spend_id", "user_id"
+            self.__lookup = self.__cryptobot_transfer
+            self.__paid = ("completed",)
+        elif isinstance(client, AsyncXRocket) and withdrawal:
+            self.__send, self.__key_field, self.__recipient_field = client.withdrawal, "withdrawalId", "address"
+            self.__lookup = client.withdrawal_status
+            self.__paid, self.__rejected = ("COMPLETED",), ("FAIL",)
+        elif isinstance(client, AsyncXRocket):
+            # XRocket transfers are final in the response and cannot be looked up.
+            self.__send, self.__key_field, self.__recipient_field = client.transfer, "transferId", "tgUserId"
+        else:
+            raise ValueError(f'Mass payouts are not supported for {type(client).__name__}')
+
+    def key(self, recipient: Any) -> str:
+        """Idempotency key of a recipient in this batch."""
+        return hashlib.sha256(f"{self.__batch_id}:{recipient}".encode()).hexdigest()[:32]
+
+    async def __cryptobot_transfer(self, spend_id: str) -> Optional[Any]:
+        transfers = await self.__client.get_transfers(spend_id=spend_id)
+        return transfers[0] if transfers else None
+
+    async def _process(self, index: int, spec: dict) -> BatchResult:
+        spec = dict(spec)
+        if self.__key_field not in spec:
+            if spec.get(self.__recipient_field) is None:
+                error = ValueError(f'Payout has neither {self.__key_field} nor {self.__recipient_field}')
+                return BatchResult(index, spec, BatchStatuses.FAILED, error=error)
+            spec[self.__key_field] = self.key(spec[self.__recipient_field])
+        for attempt in range(self.__retries + 1):
+            try:
+                result = await self._call(self.__send, **spec)
+            except Exception as error:
+                if not is_transient(error) or attempt == self.__retries:
+                    return BatchResult(index, spec, BatchStatuses.FAILED, error=error)
+                await asyncio.sleep(self.__retry_delay * 2 ** attempt)
+            else:
+                return BatchResult(index, spec, BatchStatuses.SUCCESS, result)
+
+    def __confirmed(self, item: Optional[BatchResult], payout: Any) -> None:
+        if item is None or payout is None or getattr(payout, "is_final", None) is False:
+            return
+        if payout.status in self.__paid:
+            item.status = BatchStatuses.SUCCESS
+            item.result = payout
+            item.error = None
+        elif payout.status in self.__rejected:
+            item.status = BatchStatuses.FAILED
+            item.result = payout
+
+    async def __look_up(self, item: BatchResult, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                self.__confirmed(item, await self._call(self.__lookup, item.spec[self.__key_field]))
+            except Exception:
+                # Not found or not reachable: the item keeps the result of sending.
+                pass
+
+    async def confirm(self, results: List[BatchResult]) -> List[BatchResult]:
+        """Load the current state of sent payouts and update the results in place.
+
+        Items the provider paid out become successful, for example failed ones whose response was lost, and
+        items it rejected become failed. Payouts that are not final yet leave their items as they are.
+        CryptoBot transfers are loaded 1000 per request by ID, Cryptomus payouts, XRocket withdrawals and
+        CryptoBot transfers without an ID one by one with at most concurrency requests in flight.
+
+        :param results: Results returned by run() or stream().
+        :return: The same results."""
+        if self.__lookup is None:
+            return results
+        items = [item for item in results if item.status != BatchStatuses.SKIPPED and self.__key_field in item.spec]
+        if isinstance(self.__client, AsyncCryptoBot):
+            by_id = {item.result.transfer_id: item for item in items
+                     if item.ok and item.result is not None and item.result.transfer_id}
+            ids = list(by_id)
+            for start in range(0, len(ids), 1000):
+                try:
+                    transfers = await self._call(self.__client.get_transfers, transfer_ids=ids[start:start + 1000],
+                                                 count=1000)
+                except Exception:
+                    continue
+                for transfer in transfers or []:
+                    self.__confirmed(by_id.get(transfer.transfer_id), transfer)
+            items = [item for item in items if not item.ok]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*[self.__look_up(item, semaphore) for item in items])
+        return results
+
+    async def pay(self, specs: Iterable[dict]) -> List[BatchResult]:
+        """Send all payouts and confirm them.
+
+        Example: results = await payout.pay({"user_id": user_id, "asset": "USDT", "amount": 1} for user_id in winners)
+
+        :param specs: Keyword arguments of create_payout, transfer or withdrawal, one dict per recipient. The key field is filled in.
+        :return: Results in input order."""
+        return await self.confirm(await self.run(specs))
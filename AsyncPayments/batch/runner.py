@@ -0,0 +1,86 @@
+from ..ratelimit import RateLimiter
+from .models import BatchResult, BatchPolicies, BatchStatuses
+from typing import Optional, Any, List, Iterable, AsyncIterator, Callable, Awaitable
+from collections import deque
+from abc import ABC, abstractmethod
+
+import asyncio
+
+
+class BatchRunner(ABC):
+
+    def __init__(self, concurrency: Optional[int] = 10, rate: Optional[float] = None,
+                 policy: Optional[str] = BatchPolicies.CONTINUE) -> None:
+        """
+        Run the items of a batch with at most concurrency items in flight and stream results in input order.
+
+        Subclasses implement _process() for one item and send their requests through _call(). With the stop
+        policy the first failure stops the batch: items already started are finished and reported, the rest
+        are reported as skipped.
+
+        :param concurrency: Optional. Maximum number of items in flight. Default is 10.
+        :param rate: Optional. Maximum requests per second. Default is None (no limit).
+        :param policy: Optional. One of BatchPolicies. Default is continue.
+        """
+        if concurrency < 1:
+            raise ValueError('Concurrency must be at least 1')
+        self.__concurrency = concurrency
+        self.__limiter = RateLimiter(rate) if rate else None
+        self.__policy = policy
+
+    @property
+    def concurrency(self) -> int:
+        return self.__concurrency
+
+    async def _call(self, method: Callable[..., Awaitable], /, *args: Any, **kwargs: Any) -> Any:
+        if self.__limiter is not None:
+            await self.__limiter.acquire()
+        return await method(*args, **kwargs)
+
+    @abstractmethod
+    async def _process(self, index: int, spec: dict) -> BatchResult:
+        pass
+
+    async def __process(self, index: int, spec: dict, semaphore: asyncio.Semaphore,
+                        stopped: asyncio.Event) -> BatchResult:
+        async with semaphore:
+            if stopped.is_set():
+                return BatchResult(index, spec, BatchStatuses.SKIPPED)
+            result = await self._process(index, spec)
+            if result.status == BatchStatuses.FAILED and self.__policy == BatchPolicies.STOP:
+                stopped.set()
+            return result
+
+    async def stream(self, specs: Iterable[dict]) -> AsyncIterator[BatchResult]:
+        """Run the items and yield their results in input order.
+
+        :param specs: Keyword arguments of the items, one dict per item. Read lazily, so a generator works for large batches."""
+        semaphore = asyncio.Semaphore(self.__concurrency)
+        stopped = asyncio.Event()
+        items = enumerate(specs)
+        # Started items are kept in input order. The window is larger than concurrency, so a slow
+        # item at the head does not leave the other slots idle.
+        window: deque = deque()
+        try:
+            while True:
+                while not stopped.is_set() and len(window) < self.__concurrency * 2:
+                    item = next(items, None)
+                    if item is None:
+                        break
+                    window.append(asyncio.ensure_future(self.__process(*item, semaphore, stopped)))
+                if not window:
+                    break
+                yield await window.popleft()
+            # Stopped by a failure: the items that were not started are reported as skipped.
+            for index, spec in items:
+                yield BatchResult(index, spec, BatchStatuses.SKIPPED)
+        finally:
+            # Closed early: nothing new is sent, items in flight are finished.
+            stopped.set()
+            await asyncio.gather(*window, return_exceptions=True)
+
+    async def run(self, specs: Iterable[dict]) -> List[BatchResult]:
+        """Run the items and return all results in input order.
+
+        :param specs: Keyword arguments of the items, one dict per item."""
+        return [result async for result in self.stream(specs)]
@@ -1 +1,2 @@
-from .api import AsyncCryptoBot
\ No newline at end of file
+from .api import AsyncCryptoBot
+from .tracker import InvoiceTracker
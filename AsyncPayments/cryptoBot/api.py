@@ -1,16 +1,20 @@
 from ..requests import RequestsClient
 from typing import Optional, Union, List
 from .models import Invoice, MeInfo, Transfer, Balance, Check, ExchangeRate, Currency
+from .batching import LookupBatcher
+import hashlib
+import hmac
 
 
 class AsyncCryptoBot(RequestsClient):
     API_HOST: str = "https://t.me/Cryptobot"
 
-    def __init__(self, token: str, is_testnet: bool = False) -> None:
+    def __init__(self, token: str, is_testnet: bool = False, batch_window: Optional[float] = None) -> None:
         """
         Initialize CryptoBot API client
         :param token: Your Token
         :param is_testnet: Optional. True - Testnet is on. False - Testnet is off. Default to False.
+        :param batch_window: Optional. Micro-batching window in seconds. If set, get_invoices() and get_checks() calls that only pass IDs and are made within this window are sent as one multi-ID request. Default to None (off).
         """
         super().__init__()
         self.__token = token
@@ -23,12 +27,37 @@ class AsyncCryptoBot(RequestsClient):
             self.__base_url = "https://pay.crypt.bot/api"
         self.__post_method = "POST"
         self.__payment_name = "cryptoBot"
+        self.__invoices_batcher = None
+        self.__checks_batcher = None
+        if batch_window is not None:
+            self.__invoices_batcher = LookupBatcher(
+                lambda ids: self.get_invoices(invoice_ids=ids, count=len(ids)),
+                lambda invoice: invoice.invoice_id, batch_window,
+            )
+            self.__checks_batcher = LookupBatcher(
+                lambda ids: self.get_checks(check_ids=ids, count=len(ids)),
+                lambda check: check.check_id, batch_window,
+            )
         self.check_values()
 
     def check_values(self):
         if not self.__token:
             raise ValueError('No Token specified')
 
+    def check_webhook_signature(self, body: Union[bytes, str], signature: str) -> bool:
+        """Check the crypto-pay-api-signature header of a webhook update.
+
+        Docs: https://help.crypt.bot/crypto-pay-api#verifying-webhook-updates
+
+        :param body: Raw request body.
+        :param signature: Value of the crypto-pay-api-signature header.
+        :return: True if the update was sent by CryptoBot."""
+        if isinstance(body, str):
+            body = body.encode()
+        secret = hashlib.sha256(self.__token.encode()).digest()
+        expected = hmac.new(secret, body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
     async def get_me(self) -> MeInfo:
         """Use this method to test your app's authentication token. Requires no parameters. On success, returns basic information about an app.
 
@@ -212,6 +241,9 @@ callback – “Return”
         :param count: Optional. Number of invoices to be returned. Values between 1-1000 are accepted. Defaults to 100.
         """
 
+        if self.__invoices_batcher and isinstance(invoice_ids, list) and invoice_ids and not any((asset, fiat, status, offset, count)):
+            return await self.__invoices_batcher.get(invoice_ids)
+
         url = f"{self.__base_url}/getInvoices"
 
         if invoice_ids and type(invoice_ids) == list:
@@ -237,7 +269,8 @@ callback – “Return”
             return [Invoice(**invoice) for invoice in response["result"]["items"]]
 
     async def get_transfers(self, asset: Optional[str] = None, transfer_ids: Optional[list] = None,
-                            offset: Optional[int] = None, count: Optional[int] = None) -> Union[Transfer, List[Transfer]]:
+                            offset: Optional[int] = None, count: Optional[int] = None,
+                            spend_id: Optional[str] = None) -> Union[Transfer, List[Transfer]]:
         """Use this method to get transfers created by your app.
 
         Docs: https://help.crypt.bot/crypto-pay-api#getTransfers
@@ -246,6 +279,7 @@ callback – “Return”
         :param transfer_ids: Optional. List of transfer IDs.
         :param offset: Optional. Offset needed to return a specific subset of transfers. Defaults to 0.
         :param count: Optional. Number of transfers to be returned. Values between 1-1000 are accepted. Defaults to 100.
+        :param spend_id: Optional. Unique UTF-8 transfer string passed to transfer().
         """
         url = f"{self.__base_url}/getTransfers"
 
@@ -255,6 +289,7 @@ callback – “Return”
         params = {
             "asset": asset,
             "transfer_ids": transfer_ids,
+            "spend_id": spend_id,
             "offset": offset,
             "count": count,
         }
@@ -282,6 +317,9 @@ callback – “Return”
         :param offset: Optional. Offset needed to return a specific subset of check. Defaults to 0.
         :param count: Optional. Number of check to be returned. Values between 1-1000 are accepted. Defaults to 100.
         """
+        if self.__checks_batcher and isinstance(check_ids, list) and check_ids and not any((asset, status, offset, count)):
+            return await self.__checks_batcher.get(check_ids)
+
         url = f"{self.__base_url}/getChecks"
 
         if check_ids and type(check_ids) == list:
@@ -0,0 +1,73 @@
+from typing import Optional, List, Dict, Set, Tuple, Callable, Awaitable, Any
+
+import asyncio
+
+
+class LookupBatcher:
+
+    def __init__(self, fetch: Callable[[List[int]], Awaitable[Optional[list]]], key: Callable[[Any], int],
+                 window: float, max_size: Optional[int] = 1000) -> None:
+        """
+        Collect ID lookups made within a short time window into one multi-ID request.
+
+        :param fetch: Coroutine function that loads items for a list of IDs.
+        :param key: Returns the ID of a loaded item.
+        :param window: Time window in seconds to collect lookups.
+        :param max_size: Optional. Maximum number of IDs per request. Default is 1000.
+        """
+        self.__fetch = fetch
+        self.__key = key
+        self.__window = window
+        self.__max_size = max_size
+        self.__ids: Dict[int, None] = {}
+        self.__waiting: List[Tuple[List[int], asyncio.Future]] = []
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        # Running requests are referenced here, so they are not garbage collected before they finish.
+        self.__tasks: Set[asyncio.Future] = set()
+
+    async def get(self, ids: List[int]) -> Optional[list]:
+        """Load items by IDs together with other lookups of the same window.
+
+        :return: Found items in the order of the IDs, or None if nothing was found."""
+        ids = [int(item_id) for item_id in ids]
+        if len(self.__ids.keys() | set(ids)) > self.__max_size:
+            self.__flush()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__waiting.append((ids, future))
+        self.__ids.update(dict.fromkeys(ids))
+        if len(self.__ids) >= self.__max_size:
+            self.__flush()
+        elif self.__timer is None:
+            self.__timer = loop.call_later(self.__window, self.__flush)
+        return await future
+
+    def __flush(self) -> None:
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if not self.__waiting:
+            return
+        ids, waiting = list(self.__ids), self.__waiting
+        self.__ids, self.__waiting = {}, []
+        task = asyncio.ensure_future(self.__resolve(ids, waiting))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __resolve(self, ids: List[int], waiting: List[Tuple[List[int], asyncio.Future]]) -> None:
+        try:
+            # A single lookup can bring more IDs than one request takes.
+            chunks = await asyncio.gather(*[
+                self.__fetch(ids[start:start + self.__max_size]) for start in range(0, len(ids), self.__max_size)
+            ])
+        except Exception as error:
+            for _, future in waiting:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        by_id = {self.__key(item): item for items in chunks for item in items or []}
+        for item_ids, future in waiting:
+            if future.done():
+                continue
+            found = [by_id[item_id] for item_id in item_ids if item_id in by_id]
+            future.set_result(found or None)
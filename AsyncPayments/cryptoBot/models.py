@@ -79,3 +79,10 @@ class Currency(BaseModel):
     code: Optional[str] = None
     url: Optional[str] = None
     decimals: Optional[int] = None
+
+
+class Update(BaseModel):
+    update_id: Optional[int] = None
+    update_type: Optional[str] = None
+    request_date: Optional[str] = None
+    payload: Optional[Invoice] = None
@@ -0,0 +1,164 @@
+from .api import AsyncCryptoBot
+from .models import Invoice
+from typing import Optional, Union, List, Set, Callable, Awaitable, AsyncIterator
+
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceTracker:
+
+    def __init__(self, client: AsyncCryptoBot, min_interval: Optional[float] = 1.0,
+                 max_interval: Optional[float] = 30.0, batch_size: Optional[int] = 1000) -> None:
+        """
+        Track pending CryptoBot invoices with batched getInvoices calls.
+
+        All registered invoice IDs are checked with one request per batch_size IDs. The polling interval
+        starts at min_interval, doubles after every round without changes up to max_interval and drops back
+        to min_interval as soon as an invoice is paid or expires.
+
+        :param client: CryptoBot API client.
+        :param min_interval: Optional. Shortest pause between rounds in seconds. Default is 1.
+        :param max_interval: Optional. Longest pause between rounds in seconds. Default is 30.
+        :param batch_size: Optional. Invoice IDs per request, up to 1000. Default is 1000.
+        """
+        self.__client = client
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__interval = min_interval
+        self.__batch_size = min(batch_size, 1000)
+        self.__pending: Set[int] = set()
+        self.__paid_callbacks: List[Callable[[Invoice], Awaitable]] = []
+        self.__expired_callbacks: List[Callable[[Invoice], Awaitable]] = []
+        self.__listeners: Set[asyncio.Queue] = set()
+        self.__task: Optional[asyncio.Task] = None
+        self.__wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def pending(self) -> Set[int]:
+        return set(self.__pending)
+
+    def register(self, invoice_id: Union[int, Invoice]) -> None:
+        """Start tracking an invoice.
+
+        :param invoice_id: Invoice ID or Invoice object."""
+        if isinstance(invoice_id, Invoice):
+            invoice_id = invoice_id.invoice_id
+        was_idle = not self.__pending
+        self.__pending.add(int(invoice_id))
+        self.__interval = self.__min_interval
+        if was_idle and self.__wakeup is not None:
+            self.__wakeup.set()
+
+    def unregister(self, invoice_id: Union[int, Invoice]) -> None:
+        """Stop tracking an invoice.
+
+        :param invoice_id: Invoice ID or Invoice object."""
+        if isinstance(invoice_id, Invoice):
+            invoice_id = invoice_id.invoice_id
+        self.__pending.discard(int(invoice_id))
+
+    def on_paid(self, callback: Callable[[Invoice], Awaitable]) -> Callable[[Invoice], Awaitable]:
+        """Register an async callback called with every paid invoice. Can be used as a decorator."""
+        self.__paid_callbacks.append(callback)
+        return callback
+
+    def on_expired(self, callback: Callable[[Invoice], Awaitable]) -> Callable[[Invoice], Awaitable]:
+        """Register an async callback called with every expired invoice. Can be used as a decorator."""
+        self.__expired_callbacks.append(callback)
+        return callback
+
+    async def poll(self) -> List[Invoice]:
+        """Check all pending invoices once and dispatch events.
+
+        :return: Invoices that were paid or expired in this round."""
+        pending = list(self.__pending)
+        batches = [pending[i:i + self.__batch_size] for i in range(0, len(pending), self.__batch_size)]
+        results = await asyncio.gather(*[
+            self.__client.get_invoices(invoice_ids=batch, count=len(batch)) for batch in batches
+        ])
+        finished = []
+        for batch, invoices in zip(batches, results):
+            found = set()
+            for invoice in invoices or []:
+                found.add(invoice.invoice_id)
+                if invoice.status in ("paid", "expired"):
+                    finished.append(invoice)
+            # Deleted invoices are not returned anymore.
+            self.__pending.difference_update(set(batch) - found)
+        for invoice in finished:
+            self.__pending.discard(invoice.invoice_id)
+            await self.__dispatch(invoice)
+        return finished
+
+    async def __dispatch(self, invoice: Invoice) -> None:
+        callbacks = self.__paid_callbacks if invoice.status == "paid" else self.__expired_callbacks
+        # A failing callback is logged and does not keep the invoice from the other callbacks and listeners.
+        for callback in callbacks:
+            try:
+                await callback(invoice)
+            except Exception:
+                logger.exception("Invoice callback %r failed for invoice %s", callback, invoice.invoice_id)
+        for queue in self.__listeners:
+            try:
+                queue.put_nowait(invoice)
+            except Exception:
+                logger.exception("Invoice listener failed for invoice %s", invoice.invoice_id)
+
+    async def events(self) -> AsyncIterator[Invoice]:
+        """Iterate over paid and expired invoices as the tracker finds them. Check invoice.status to tell them apart."""
+        queue = asyncio.Queue()
+        self.__listeners.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.__listeners.discard(queue)
+
+    def __aiter__(self) -> AsyncIterator[Invoice]:
+        return self.events()
+
+    async def __run(self) -> None:
+        while True:
+            if self.__pending:
+                try:
+                    finished = await self.poll()
+                except Exception:
+                    # Keep tracking through API or network errors, just slow down.
+                    logger.exception("Invoice poll failed")
+                    finished = []
+                if finished:
+                    self.__interval = self.__min_interval
+                else:
+                    self.__interval = min(self.__interval * 2, self.__max_interval)
+            self.__wakeup.clear()
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), self.__interval if self.__pending else None)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Start polling in a background task."""
+        if self.__task is None or self.__task.done():
+            self.__wakeup = asyncio.Event()
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+
+    async def __aenter__(self) -> "InvoiceTracker":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
@@ -6,6 +6,7 @@ from .models import Balance, Balances, CreatePayment, GenerateStaticWallet, Gene
 import base64
 import json
 import hashlib
+import hmac
 
 
 class AsyncCryptomus(RequestsClient):
@@ -46,6 +47,21 @@ class AsyncCryptomus(RequestsClient):
             return hashlib.md5((data_encoded + self.__payout_api_key).encode()).hexdigest()
         return hashlib.md5((data_encoded + self.__payment_api_key).encode()).hexdigest()
 
+    def check_webhook_signature(self, data: dict) -> bool:
+        """Check the sign field of a webhook. Payout webhooks are checked with the payout API key.
+
+        Docs: https://doc.cryptomus.com/ru/business/payments/webhook
+
+        :param data: Parsed webhook body, including the sign field.
+        :return: True if the webhook was sent by Cryptomus."""
+        data = dict(data)
+        signature = data.pop("sign", None) or ""
+        # Cryptomus signs the PHP json_encode output: no spaces, unescaped unicode and escaped slashes.
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("/", "\\/")
+        key = self.__payout_api_key if data.get("type") == "payout" else self.__payment_api_key
+        expected = hashlib.md5((base64.b64encode(payload.encode()).decode() + key).encode()).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
     async def get_balance(self) -> Balances:
         """Get list of your balances.
 
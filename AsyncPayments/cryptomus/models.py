@@ -273,4 +273,26 @@ class PayoutStatuses:
     PAID: str = "paid"
     FAIL: str = "fail"
     CANCEL: str = "cancel"
-    SYSTEM_FAIL: str = "system_fail"
\ No newline at end of file
+    SYSTEM_FAIL: str = "system_fail"
+
+
+class Webhook(BaseModel):
+    type_: Optional[str] = Field(alias="type", default=None)
+    uuid: Optional[str] = None
+    order_id: Optional[str] = None
+    amount: Optional[str] = None
+    payment_amount: Optional[str] = None
+    payment_amount_usd: Optional[str] = None
+    merchant_amount: Optional[str] = None
+    commission: Optional[str] = None
+    is_final: Optional[bool] = None
+    status: Optional[str] = None
+    from_: Optional[str] = Field(alias="from", default=None)
+    wallet_address_uuid: Optional[str] = None
+    network: Optional[str] = None
+    currency: Optional[str] = None
+    payer_currency: Optional[str] = None
+    additional_data: Optional[str] = None
+    convert: Optional[dict] = None
+    txid: Optional[str] = None
+    sign: Optional[str] = None
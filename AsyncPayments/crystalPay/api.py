@@ -5,6 +5,7 @@ from .models import CreatePayment, CassaInfo, PayoffCreate, TickersRate, PayoffR
                     CreateSwap, SwapInfo, CreateTransfer, TransferInfo, Stats
 import json
 import hashlib
+import hmac
 
 
 class AsyncCrystalPay(RequestsClient):
@@ -33,6 +34,18 @@ class AsyncCrystalPay(RequestsClient):
         if not self.__login or not self.__secret or not self.__salt:
             raise ValueError('No Secret, Login or Salt specified')
 
+    def __sign(self, *values: Union[int, float, str]) -> str:
+        return hashlib.sha1(":".join(map(str, (*values, self.__salt))).encode()).hexdigest()
+
+    def check_webhook_signature(self, invoice_id: str, signature: str) -> bool:
+        """Check the signature field of a callback.
+
+        :param invoice_id: Invoice ID from the callback.
+        :param signature: Signature from the callback.
+        :return: True if the callback was sent by CrystalPay."""
+        expected = self.__sign(invoice_id)
+        return hmac.compare_digest(expected, signature or "")
+
     async def get_cassa_info(self, hide_empty: Optional[bool]= False) -> CassaInfo:
         """Get cash info.
 
@@ -231,7 +244,7 @@ class AsyncCrystalPay(RequestsClient):
 
         url = f'{self.__base_url}/payoff/create/'
 
-        signature = hashlib.sha1(str.encode(f"{amount}:{method}:{wallet}:{self.__salt}")).hexdigest()
+        signature = self.__sign(amount, method, wallet)
 
         params = {
             "auth_login": self.__login,
@@ -257,7 +270,7 @@ class AsyncCrystalPay(RequestsClient):
 
         :param payoff_id: Payoff ID"""
 
-        signature = hashlib.sha1(str.encode(f"{payoff_id}:{self.__salt}")).hexdigest()
+        signature = self.__sign(payoff_id)
 
         url = f"{self.__base_url}/payoff/submit/"
 
@@ -280,7 +293,7 @@ class AsyncCrystalPay(RequestsClient):
 
         :param payoff_id: Payoff ID"""
 
-        signature = hashlib.sha1(str.encode(f"{payoff_id}:{self.__salt}")).hexdigest()
+        signature = self.__sign(payoff_id)
 
         url = f"{self.__base_url}/payoff/cancel/"
 
@@ -410,7 +423,7 @@ class AsyncCrystalPay(RequestsClient):
         """
         
         url = f"{self.__base_url}/swap/create/"
-        signature = hashlib.sha1(str.encode(f"{amount}:{pair_id}:{self.__salt}")).hexdigest()
+        signature = self.__sign(amount, pair_id)
 
         params = {
             "auth_login": self.__login,
@@ -434,7 +447,7 @@ class AsyncCrystalPay(RequestsClient):
         """
         
         url = f"{self.__base_url}/swap/submit/"
-        signature = hashlib.sha1(str.encode(f"{swap_id}:{self.__salt}")).hexdigest()
+        signature = self.__sign(swap_id)
 
         params = {
             "auth_login": self.__login,
@@ -456,7 +469,7 @@ class AsyncCrystalPay(RequestsClient):
         """
         
         url = f"{self.__base_url}/swap/cancel/"
-        signature = hashlib.sha1(str.encode(f"{swap_id}:{self.__salt}")).hexdigest()
+        signature = self.__sign(swap_id)
 
         params = {
             "auth_login": self.__login,
@@ -503,7 +516,7 @@ class AsyncCrystalPay(RequestsClient):
         """
         
         url = f"{self.__base_url}/transfer/create/"
-        signature = hashlib.sha1(str.encode(f"{amount}:{method}:{receiver}:{self.__salt}")).hexdigest()
+        signature = self.__sign(amount, method, receiver)
         
         params = {
             "auth_login": self.__login,
@@ -528,7 +541,7 @@ class AsyncCrystalPay(RequestsClient):
         """
         
         url = f"{self.__base_url}/transfer/submit/"
-        signature = hashlib.sha1(str.encode(f"{transfer_id}:{self.__salt}")).hexdigest()
+        signature = self.__sign(transfer_id)
         
         params = {
             "auth_login": self.__login,
@@ -550,7 +563,7 @@ class AsyncCrystalPay(RequestsClient):
         """
         
         url = f"{self.__base_url}/transfer/submit/"
-        signature = hashlib.sha1(str.encode(f"{transfer_id}:{self.__salt}")).hexdigest()
+        signature = self.__sign(transfer_id)
         
         params = {
             "auth_login": self.__login,
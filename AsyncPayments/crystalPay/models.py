@@ -149,4 +149,27 @@ class Stats(BaseModel):
     payed_count: Optional[int] = None
     total_count: Optional[int] = None
     conversion_percent: Optional[int] = None
-    
\ No newline at end of file
+    
+
+class Callback(BaseModel):
+    id: Optional[str] = None
+    signature: Optional[str] = None
+    url: Optional[str] = None
+    state: Optional[str] = None
+    type_: Optional[str] = Field(alias="type", default=None)
+    method: Optional[str] = None
+    required_method: Optional[str] = None
+    currency: Optional[str] = None
+    service_commission: Optional[float] = None
+    extra_commission: Optional[float] = None
+    amount: Optional[float] = None
+    pay_amount: Optional[float] = None
+    remaining_amount: Optional[float] = None
+    balance_amount: Optional[float] = None
+    description: Optional[str] = None
+    redirect_url: Optional[str] = None
+    callback_url: Optional[str] = None
+    extra: Optional[str] = None
+    created_at: Optional[str] = None
+    expired_at: Optional[str] = None
+    final_at: Optional[str] = None
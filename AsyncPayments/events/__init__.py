@@ -0,0 +1,2 @@
+from .stream import PaymentEventStream
+from .models import PaymentEvent, EventTypes, EventSources
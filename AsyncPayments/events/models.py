@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, Any
+
+
+class EventTypes:
+    CREATED: str = "created"
+    PAID: str = "paid"
+    EXPIRED: str = "expired"
+    FAILED: str = "failed"
+
+
+class EventSources:
+    LOCAL: str = "local"
+    WEBHOOK: str = "webhook"
+    POLLING: str = "polling"
+
+
+class PaymentEvent(BaseModel):
+    provider: Optional[str] = None
+    payment_id: Optional[str] = None
+    status: Optional[str] = None
+    source: Optional[str] = None
+    data: Optional[Any] = None
+    created_at: Optional[datetime] = None
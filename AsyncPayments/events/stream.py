@@ -0,0 +1,220 @@
+from ..cryptoBot import AsyncCryptoBot, InvoiceTracker
+from ..cryptoBot.models import Invoice
+from ..cryptomus import AsyncCryptomus
+from ..apays import AsyncAPays
+from ..platega import AsyncPlatega
+from ..aaio import AsyncAaio
+from ..ruKassa import AsyncRuKassa
+from ..yoomoney import AsyncYoomoney
+from ..polling import PaymentPoller, PendingPayment, cryptomus_check, apays_check, platega_check, \
+                      aaio_check, rukassa_check, YoomoneyBatchCheck
+from ..webhooks import WebhookReceiver, WebhookEvent, DedupStore
+from .models import PaymentEvent, EventTypes, EventSources
+from typing import Optional, Union, Any, Dict, Set, AsyncIterator
+from datetime import datetime, timezone
+
+import asyncio
+
+
+# Webhook statuses of all providers that end a payment, compared in lower case.
+WEBHOOK_STATUSES = {
+    "paid": EventTypes.PAID,
+    "paid_over": EventTypes.PAID,
+    "payed": EventTypes.PAID,
+    "success": EventTypes.PAID,
+    "approve": EventTypes.PAID,
+    "confirmed": EventTypes.PAID,
+    "expired": EventTypes.EXPIRED,
+    "cancel": EventTypes.EXPIRED,
+    "fail": EventTypes.FAILED,
+    "system_fail": EventTypes.FAILED,
+    "wrong_amount": EventTypes.FAILED,
+    "decline": EventTypes.FAILED,
+    "canceled": EventTypes.FAILED,
+    "chargebacked": EventTypes.FAILED,
+}
+
+
+class PaymentEventStream:
+
+    def __init__(self, receiver: Optional[WebhookReceiver] = None, fallback_delay: Optional[float] = 30.0,
+                 min_interval: Optional[float] = 2.0, max_interval: Optional[float] = 60.0,
+                 rate_limits: Optional[Dict[str, float]] = None, dedup: Optional[DedupStore] = None) -> None:
+        """
+        One stream of created, paid, expired and failed events for payments of several providers.
+
+        Final statuses come from webhooks when a receiver is given and from polling otherwise. With a
+        receiver, polling of providers that send webhooks starts only after fallback_delay, so it only
+        costs requests when a webhook is missing or late. Every payment ends with exactly one final event,
+        whichever source reports it first.
+
+        CryptoBot invoices are polled in batches with InvoiceTracker and YooMoney labels with one operation
+        history scan per round. Cryptomus, APays, Platega, Aaio and RuKassa are polled with PaymentPoller.
+
+        :param receiver: Optional. Webhook receiver with the providers added. Default is None (polling only).
+        :param fallback_delay: Optional. Seconds to wait for a webhook before polling. Default is 30.
+        :param min_interval: Optional. Shortest pause between checks in seconds. Default is 2.
+        :param max_interval: Optional. Longest pause between checks in seconds. Default is 60.
+        :param rate_limits: Optional. Maximum checks per second by provider name, for example {"aaio": 1}.
+        :param dedup: Optional. Store of finished payments. Pass a DedupStore with a path to keep it across restarts. Default is an in-memory store.
+        """
+        self.__has_webhooks = receiver is not None
+        self.__fallback_delay = fallback_delay
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__dedup = dedup or DedupStore()
+        self.__poller = PaymentPoller(min_interval, max_interval, rate_limits=rate_limits)
+        self.__poller.on_paid(self.__on_polled)
+        self.__poller.on_failed(self.__on_polled)
+        self.__poller.on_expired(self.__on_polled)
+        self.__trackers: Dict[int, InvoiceTracker] = {}
+        # CryptoBot invoices waiting for fallback_delay before they are tracked.
+        self.__delayed: Dict[str, asyncio.TimerHandle] = {}
+        self.__yoomoney: Dict[int, YoomoneyBatchCheck] = {}
+        self.__listeners: Set[asyncio.Queue] = set()
+        self.__started = False
+        if receiver is not None:
+            receiver.on_event(self.__on_webhook)
+
+    def __tracker(self, client: AsyncCryptoBot) -> InvoiceTracker:
+        tracker = self.__trackers.get(id(client))
+        if tracker is None:
+            tracker = InvoiceTracker(client, self.__min_interval, self.__max_interval)
+            tracker.on_paid(self.__on_tracked)
+            tracker.on_expired(self.__on_tracked)
+            self.__trackers[id(client)] = tracker
+            if self.__started:
+                tracker.start()
+        return tracker
+
+    def __check(self, client: Any, payment_id: str):
+        if isinstance(client, AsyncCryptomus):
+            return "cryptomus", cryptomus_check(client, payment_id), True
+        if isinstance(client, AsyncAPays):
+            return "apays", apays_check(client, payment_id), True
+        if isinstance(client, AsyncPlatega):
+            return "platega", platega_check(client, payment_id), True
+        if isinstance(client, AsyncAaio):
+            return "aaio", aaio_check(client, payment_id), True
+        if isinstance(client, AsyncRuKassa):
+            return "ruKassa", rukassa_check(client, int(payment_id)), False
+        if isinstance(client, AsyncYoomoney):
+            batch = self.__yoomoney.setdefault(id(client), YoomoneyBatchCheck(client))
+            return "yoomoney", batch.check(payment_id), False
+        raise ValueError(f'Polling is not supported for {type(client).__name__}')
+
+    def watch(self, client: Any, payment_id: Union[int, str], expires_in: Optional[float] = None,
+              data: Optional[Any] = None) -> PaymentEvent:
+        """Start watching a payment and emit its created event.
+
+        :param client: Provider API client: AsyncCryptoBot, AsyncCryptomus, AsyncAPays, AsyncPlatega, AsyncAaio, AsyncRuKassa or AsyncYoomoney.
+        :param payment_id: CryptoBot invoice ID, Cryptomus invoice uuid, APays, Aaio or RuKassa order ID, Platega transaction ID or YooMoney label.
+        :param expires_in: Optional. Seconds until the payment expires. CryptoBot invoices report expiry themselves.
+        :param data: Optional. Object returned by the provider on creation, passed as data of the created event.
+        :return: Created event."""
+        payment_id = str(payment_id)
+        if isinstance(client, AsyncCryptoBot):
+            provider = "cryptoBot"
+            tracker = self.__tracker(client)
+            if self.__has_webhooks:
+                self.__delayed[payment_id] = asyncio.get_running_loop().call_later(
+                    self.__fallback_delay, self.__register, tracker, payment_id,
+                )
+            else:
+                tracker.register(int(payment_id))
+        else:
+            provider, check, has_webhooks = self.__check(client, payment_id)
+            first_check_in = self.__fallback_delay if self.__has_webhooks and has_webhooks else None
+            self.__poller.add(f"{provider}:{payment_id}", provider, check, expires_in, first_check_in=first_check_in)
+        event = self.__event(provider, payment_id, EventTypes.CREATED, EventSources.LOCAL, data)
+        self.__publish(event)
+        return event
+
+    def __register(self, tracker: InvoiceTracker, payment_id: str) -> None:
+        del self.__delayed[payment_id]
+        tracker.register(int(payment_id))
+
+    def unwatch(self, provider: str, payment_id: Union[int, str]) -> None:
+        """Stop polling a payment.
+
+        :param provider: Provider name, for example cryptoBot.
+        :param payment_id: Payment ID passed to watch()."""
+        payment_id = str(payment_id)
+        self.__poller.remove(f"{provider}:{payment_id}")
+        if provider == "cryptoBot":
+            handle = self.__delayed.pop(payment_id, None)
+            if handle is not None:
+                handle.cancel()
+            for tracker in self.__trackers.values():
+                tracker.unregister(int(payment_id))
+
+    @staticmethod
+    def __event(provider: str, payment_id: str, status: str, source: str, data: Any) -> PaymentEvent:
+        return PaymentEvent(provider=provider, payment_id=payment_id, status=status, source=source, data=data,
+                            created_at=datetime.now(timezone.utc))
+
+    def __publish(self, event: PaymentEvent) -> None:
+        for queue in self.__listeners:
+            queue.put_nowait(event)
+
+    async def __finish(self, provider: str, payment_id: str, status: str, source: str, data: Any) -> None:
+        key = f"{provider}:{payment_id}:final"
+        if not await self.__dedup.claim(key):
+            return
+        await self.__dedup.complete(key)
+        self.unwatch(provider, payment_id)
+        self.__publish(self.__event(provider, payment_id, status, source, data))
+
+    async def __on_webhook(self, event: WebhookEvent) -> None:
+        if event.provider == "cryptomus" and getattr(event.data, "type_", None) == "payout":
+            # Payout webhooks share the statuses of payments but are not about a watched payment.
+            return
+        status = WEBHOOK_STATUSES.get(str(event.status).lower())
+        if status is not None and event.payment_id is not None:
+            await self.__finish(event.provider, event.payment_id, status, EventSources.WEBHOOK, event.data)
+
+    async def __on_polled(self, payment: PendingPayment) -> None:
+        payment_id = payment.key.split(":", 1)[1]
+        await self.__finish(payment.provider, payment_id, payment.status, EventSources.POLLING, None)
+
+    async def __on_tracked(self, invoice: Invoice) -> None:
+        status = EventTypes.PAID if invoice.status == "paid" else EventTypes.EXPIRED
+        await self.__finish("cryptoBot", str(invoice.invoice_id), status, EventSources.POLLING, invoice)
+
+    async def events(self, provider: Optional[str] = None) -> AsyncIterator[PaymentEvent]:
+        """Iterate over payment events.
+
+        :param provider: Optional. Only events of this provider, for example cryptoBot. Default is None (all)."""
+        queue = asyncio.Queue()
+        self.__listeners.add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if provider is None or event.provider == provider:
+                    yield event
+        finally:
+            self.__listeners.discard(queue)
+
+    def __aiter__(self) -> AsyncIterator[PaymentEvent]:
+        return self.events()
+
+    def start(self) -> None:
+        """Start polling in background tasks."""
+        self.__started = True
+        self.__poller.start()
+        for tracker in self.__trackers.values():
+            tracker.start()
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        self.__started = False
+        await self.__poller.stop()
+        for tracker in self.__trackers.values():
+            await tracker.stop()
+
+    async def __aenter__(self) -> "PaymentEventStream":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
@@ -3,7 +3,10 @@ class BadRequest(Exception):
 
 
 class RequestError(Exception):
-    pass
+
+    def __init__(self, *args, status=None) -> None:
+        super().__init__(*args)
+        self.status = status
 
 
 class MissingScopeError(Exception):
@@ -31,4 +34,16 @@ class InvalidGrant(Exception):
 
 
 class EmptyToken(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class InvalidSignature(Exception):
+    pass
+
+
+class RateUnavailable(Exception):
+    pass
+
+
+class PreflightError(BadRequest):
+    pass
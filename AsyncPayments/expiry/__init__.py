@@ -0,0 +1,2 @@
+from .manager import ExpiryManager
+from .wheel import TimingWheel
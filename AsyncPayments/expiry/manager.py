@@ -0,0 +1,113 @@
+from ..ratelimit import RateLimiter
+from .wheel import TimingWheel
+from typing import Optional, List, Dict, Hashable, Callable, Awaitable
+from collections import deque
+
+import asyncio
+
+
+class ExpiryManager:
+
+    def __init__(self, tick: Optional[float] = 1.0, slots: Optional[int] = 3600,
+                 rate_limits: Optional[Dict[str, float]] = None, batch_size: Optional[int] = 20,
+                 on_error: Optional[Callable[[Hashable, Exception], Awaitable]] = None) -> None:
+        """
+        Run provider-side cleanup for invoices that lapsed, using one timing wheel instead of a sleeping task per invoice.
+
+        Lapsed invoices are queued per provider and cleaned up in batches of up to batch_size concurrent calls,
+        limited by the provider's rate limit.
+
+        :param tick: Optional. Timer resolution in seconds. Default is 1.
+        :param slots: Optional. Number of wheel slots. Default is 3600 (one turn per hour with 1 second ticks).
+        :param rate_limits: Optional. Maximum cleanup calls per second by provider name, for example {"cryptoBot": 5}.
+        :param batch_size: Optional. Maximum number of concurrent cleanup calls per provider. Default is 20.
+        :param on_error: Optional. Async callback called with the key and the error if a cleanup call fails.
+        """
+        self.__wheel = TimingWheel(tick, slots)
+        self.__limiters = {provider: RateLimiter(rate) for provider, rate in (rate_limits or {}).items()}
+        self.__batch_size = batch_size
+        self.__on_error = on_error
+        self.__lapsed: Dict[str, deque] = {}
+        self.__task: Optional[asyncio.Task] = None
+        self.__workers: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self.__wheel)
+
+    def add(self, key: Hashable, expires_in: float, cleanup: Callable[[], Awaitable],
+            provider: Optional[str] = "default") -> None:
+        """Schedule cleanup of an invoice.
+
+        Example: manager.add(invoice.invoice_id, 3600, functools.partial(cryptoBot.delete_invoice, invoice.invoice_id), "cryptoBot")
+
+        :param key: Invoice key. Adding the same key again reschedules it.
+        :param expires_in: Seconds until the invoice lapses.
+        :param cleanup: Coroutine function to call when it lapses, for example AsyncCryptoBot.delete_invoice, AsyncXRocket.delete_invoice, AsyncRuKassa.revoke_payment or AsyncCryptomus.cancel_recurring_payment.
+        :param provider: Optional. Provider name, used for rate limiting."""
+        self.__wheel.add(key, expires_in, (key, provider, cleanup))
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel the cleanup of an invoice, for example after it was paid.
+
+        :param key: Invoice key.
+        :return: True if the cleanup was still scheduled."""
+        return self.__wheel.cancel(key)
+
+    def advance(self) -> List[Hashable]:
+        """Move the wheel one tick forward and queue cleanup of the lapsed invoices.
+
+        :return: Keys of the lapsed invoices."""
+        keys = []
+        for key, provider, cleanup in self.__wheel.advance():
+            self.__lapsed.setdefault(provider, deque()).append((key, cleanup))
+            keys.append(key)
+            worker = self.__workers.get(provider)
+            if worker is None or worker.done():
+                self.__workers[provider] = asyncio.create_task(self.__drain(provider))
+        return keys
+
+    async def __cleanup(self, provider: str, key: Hashable, cleanup: Callable[[], Awaitable]) -> None:
+        limiter = self.__limiters.get(provider)
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            await cleanup()
+        except Exception as error:
+            if self.__on_error is not None:
+                await self.__on_error(key, error)
+
+    async def __drain(self, provider: str) -> None:
+        lapsed = self.__lapsed[provider]
+        while lapsed:
+            batch = [lapsed.popleft() for _ in range(min(self.__batch_size, len(lapsed)))]
+            await asyncio.gather(*[self.__cleanup(provider, key, cleanup) for key, cleanup in batch])
+
+    async def __run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.__wheel.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            # Catch up on ticks missed while the event loop was busy.
+            while next_tick <= loop.time():
+                self.advance()
+                next_tick += self.__wheel.tick
+
+    def start(self) -> None:
+        """Start the wheel in a background task."""
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Stop the wheel. Queued cleanups that already lapsed are finished first."""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+        await asyncio.gather(*self.__workers.values(), return_exceptions=True)
+
+    async def __aenter__(self) -> "ExpiryManager":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
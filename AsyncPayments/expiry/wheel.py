@@ -0,0 +1,65 @@
+from typing import Optional, List, Dict, Hashable, Any
+
+import math
+
+
+class TimingWheel:
+
+    def __init__(self, tick: Optional[float] = 1.0, slots: Optional[int] = 512) -> None:
+        """
+        Hashed timing wheel. Adding and cancelling a timer is O(1), advancing one tick only touches one slot.
+
+        Timers longer than slots * tick wait for several turns of the wheel.
+
+        :param tick: Optional. Length of one tick in seconds. Default is 1.
+        :param slots: Optional. Number of slots. Default is 512.
+        """
+        self.tick = tick
+        self.__slots: List[Dict[Hashable, list]] = [{} for _ in range(slots)]
+        self.__index: Dict[Hashable, int] = {}
+        self.__cursor = 0
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__index
+
+    def add(self, key: Hashable, delay: float, value: Any) -> None:
+        """Add a timer. Adding an existing key replaces its timer.
+
+        :param key: Timer key.
+        :param delay: Delay in seconds, rounded up to whole ticks.
+        :param value: Value returned by advance() when the timer fires."""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.tick))
+        slot = (self.__cursor + ticks) % len(self.__slots)
+        self.__slots[slot][key] = [(ticks - 1) // len(self.__slots), value]
+        self.__index[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel a timer.
+
+        :param key: Timer key.
+        :return: True if the timer existed."""
+        slot = self.__index.pop(key, None)
+        if slot is None:
+            return False
+        del self.__slots[slot][key]
+        return True
+
+    def advance(self) -> List[Any]:
+        """Move the wheel one tick forward.
+
+        :return: Values of the timers that fired."""
+        self.__cursor = (self.__cursor + 1) % len(self.__slots)
+        bucket = self.__slots[self.__cursor]
+        fired = []
+        for key, entry in list(bucket.items()):
+            if entry[0] > 0:
+                entry[0] -= 1
+                continue
+            del bucket[key]
+            del self.__index[key]
+            fired.append(entry[1])
+        return fired
@@ -1,7 +1,8 @@
 from ..requests import RequestsClient
-from typing import Optional, Union, List
+from typing import Optional, Union, List, Callable, AsyncIterator
 from .models import Balance, Order, Orders, CreateOrder, Currency, WithdrawalCurrency, Store, Withdrawal, Withdrawals, CreateWithdrawal
 
+import asyncio
 import json
 import hashlib
 import time
@@ -11,31 +12,63 @@ import hmac
 class AsyncFreeKassa(RequestsClient):
     API_HOST: str = "https://freekassa.com/"
 
-    def __init__(self, apiKey: str, shopId: int) -> None:
+    def __init__(self, apiKey: str, shopId: int, secretWord2: Optional[str] = None) -> None:
         """
         Initialize FreeKassa API client
         :param apiKey: Your api key
         :param shopId: Your shop id
+        :param secretWord2: Optional. Your secret word 2, needed only to check payment notifications.
         """
         super().__init__()
         self.__apiKey = apiKey
         self.__shopId = shopId
+        self.__secretWord2 = secretWord2
         self.__headers = {
             'Content-Type': 'application/json',
         }
         self.__base_url = "https://api.freekassa.com/v1"
         self.__post_method = "POST"
         self.__payment_name = "freeKassa"
+        self.__last_nonce = 0
+        self.__nonce_lock: Optional[asyncio.Lock] = None
         self.check_values()
 
     def check_values(self):
         if not self.__shopId or not self.__apiKey:
             raise ValueError('No ShopID or ApiKey specified')
 
+    def __get_nonce(self) -> int:
+        # FreeKassa rejects a nonce that is not greater than the previous one,
+        # so requests signed within the same nanosecond must not share it.
+        self.__last_nonce = max(time.time_ns(), self.__last_nonce + 1)
+        return self.__last_nonce
+
     def __generate_sign(self, data: dict) -> str:
         data = dict(sorted(data.items()))
         return hmac.new(self.__apiKey.encode(), '|'.join(map(str, data.values())).encode(), hashlib.sha256).hexdigest()
 
+    async def __signed_request(self, url: str, params: dict) -> dict:
+        if self.__nonce_lock is None:
+            self.__nonce_lock = asyncio.Lock()
+        # Requests sent at once could reach FreeKassa out of nonce order and be rejected,
+        # so the nonce is taken and the request is sent under one lock.
+        async with self.__nonce_lock:
+            params["nonce"] = self.__get_nonce()
+            params["signature"] = self.__generate_sign(params)
+            return await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+
+    def check_webhook_signature(self, data: dict) -> bool:
+        """Check the SIGN field of a payment notification.
+
+        :param data: Notification form fields.
+        :return: True if the notification was sent by FreeKassa for your shop."""
+        if not self.__secretWord2:
+            raise ValueError('No SecretWord2 specified')
+        data_for_sign = f"{data.get('MERCHANT_ID')}:{data.get('AMOUNT')}:{self.__secretWord2}:{data.get('MERCHANT_ORDER_ID')}"
+        expected = hashlib.md5(data_for_sign.encode()).hexdigest()
+        return str(data.get('MERCHANT_ID')) == str(self.__shopId) and \
+            hmac.compare_digest(expected, str(data.get('SIGN') or '').lower())
+
     async def get_balance(self) -> List[Balance]:
         """Get balance or your store.
         
@@ -45,10 +78,8 @@ class AsyncFreeKassa(RequestsClient):
         
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
         }
-        params['signature'] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         
         return [Balance(**balance) for balance in response['balance']]
     
@@ -69,7 +100,6 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/orders"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
             "orderId": orderId,
             "paymentId": paymentId,
             "orderStatus": orderStatus,
@@ -78,8 +108,7 @@ class AsyncFreeKassa(RequestsClient):
             "page": page,
         }
         self._delete_empty_fields(params)
-        params['signature'] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
 
         return Orders(pages=int(response['pages']), orders=[Order(**order) for order in response["orders"]])
     
@@ -105,7 +134,6 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/orders/create"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
             "i": i,
             "email": email,
             "ip": ip,
@@ -118,8 +146,7 @@ class AsyncFreeKassa(RequestsClient):
             "notification_url": notificationUrl,
         }
         self._delete_empty_fields(params)
-        params['signature'] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         return CreateOrder(**response)
     
     async def get_list_of_currencies(self) -> List[Currency]:
@@ -130,10 +157,8 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/currencies"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
         }
-        params["signature"] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         
         return [Currency(**currency) for currency in response['currencies']]
     
@@ -147,10 +172,8 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/currencies/{paymentId}/status"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
         }
-        params["signature"] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         
         return response['type'] == "success"
   
@@ -162,10 +185,8 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/withdrawals/currencies"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
         }
-        params["signature"] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         
         return [WithdrawalCurrency(**currency) for currency in response['currencies']]
     
@@ -177,10 +198,8 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/shops"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
         }
-        params["signature"] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         
         return [Store(**store) for store in response['shops']]
             
@@ -201,7 +220,6 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/withdrawals"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
             "orderId": orderId,
             "paymentId": paymentId,
             "orderStatus": orderStatus,
@@ -210,11 +228,60 @@ class AsyncFreeKassa(RequestsClient):
             "page": page,
         }
         self._delete_empty_fields(params)
-        params['signature'] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         
         return Withdrawals(pages=int(response['pages']), withdrawals=[Withdrawal(**withdrawal) for withdrawal in response["orders"]])
     
+    async def __iter_pages(self, fetch: Callable, items: Callable,
+                           stop: Optional[Callable[[str], bool]]) -> AsyncIterator:
+        page, last_page = 1, 1
+        while page <= last_page:
+            result = await fetch(page)
+            for item in items(result):
+                if stop and item.date and stop(item.date):
+                    return
+                yield item
+            last_page = result.pages or 1
+            page += 1
+
+    def iter_orders(self, orderId: Optional[int] = None, paymentId: Optional[str] = None,
+                    orderStatus: Optional[int] = None, dateFrom: Optional[str] = None,
+                    dateTo: Optional[str] = None, stop: Optional[Callable[[str], bool]] = None) -> AsyncIterator[Order]:
+        """Iterate over orders of your store across all pages.
+
+        Docs: https://docs.freekassa.com/#operation/getOrders
+
+        :param orderId: Optional. Freekassa Order Number.
+        :param paymentId: Optional. The order number in your store.
+        :param orderStatus: Optional. Order status.
+        :param dateFrom: Optional. Date from. Example: dateFrom=2021-01-01 13:45:21.
+        :param dateTo: Optional. Date by. Example: dateTo=2021-01-02 13:45:21.
+        :param stop: Optional. Called with the date of every order. Iteration stops at the first order for which it returns True.
+        """
+        async def fetch(page: int) -> Orders:
+            return await self.get_orders(orderId, paymentId, orderStatus, dateFrom, dateTo, page)
+
+        return self.__iter_pages(fetch, lambda result: result.orders or [], stop)
+
+    def iter_withdrawals(self, orderId: Optional[int] = None, paymentId: Optional[str] = None,
+                         orderStatus: Optional[int] = None, dateFrom: Optional[str] = None,
+                         dateTo: Optional[str] = None, stop: Optional[Callable[[str], bool]] = None) -> AsyncIterator[Withdrawal]:
+        """Iterate over withdrawals across all pages.
+
+        Docs: https://docs.freekassa.com/#operation/getWithdrawals
+
+        :param orderId: Optional. Freekassa Order Number.
+        :param paymentId: Optional. The order number in your store.
+        :param orderStatus: Optional. Order status.
+        :param dateFrom: Optional. Date from. Example: dateFrom=2021-01-01 13:45:21.
+        :param dateTo: Optional. Date by. Example: dateTo=2021-01-02 13:45:21.
+        :param stop: Optional. Called with the date of every withdrawal. Iteration stops at the first withdrawal for which it returns True.
+        """
+        async def fetch(page: int) -> Withdrawals:
+            return await self.get_withdrawals(orderId, paymentId, orderStatus, dateFrom, dateTo, page)
+
+        return self.__iter_pages(fetch, lambda result: result.withdrawals or [], stop)
+
     async def create_withdrawal(self, i: int, account: str, amount: Union[int, float], currency: str, 
                                 paymentId: Optional[str] = None) -> CreateWithdrawal:
         """Create withdrawal.
@@ -230,7 +297,6 @@ class AsyncFreeKassa(RequestsClient):
         url = f"{self.__base_url}/withdrawals/create"
         params = {
             "shopId": self.__shopId,
-            "nonce": time.time_ns(),
             "i": i,
             "account": account,
             "amount": amount,
@@ -238,7 +304,6 @@ class AsyncFreeKassa(RequestsClient):
             "paymentId": paymentId,
         }
         self._delete_empty_fields(params)
-        params['signature'] = self.__generate_sign(params)
-        response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=json.dumps(params))
+        response = await self.__signed_request(url, params)
         return CreateWithdrawal(**response['data'])
     
\ No newline at end of file
@@ -71,4 +71,16 @@ class Withdrawals(BaseModel):
     
 class CreateWithdrawal(BaseModel):
     id: Optional[int] = None
-    
\ No newline at end of file
+    
+
+class Notification(BaseModel):
+    MERCHANT_ID: Optional[Union[int, str]] = None
+    AMOUNT: Optional[Union[float, str]] = None
+    intid: Optional[Union[int, str]] = None
+    MERCHANT_ORDER_ID: Optional[str] = None
+    P_EMAIL: Optional[str] = None
+    P_PHONE: Optional[str] = None
+    CUR_ID: Optional[Union[int, str]] = None
+    SIGN: Optional[str] = None
+    payer_account: Optional[str] = None
+    commission: Optional[Union[float, str]] = None
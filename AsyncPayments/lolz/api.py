@@ -1,5 +1,5 @@
 from ..requests import RequestsClient
-from typing import Optional, Union
+from typing import Optional, Union, Dict, List, Tuple, Iterable
 from .models import User, Payments, Invoice, Invoices
 from ..exceptions import MissingScopeError, IncorrectTokenError, UnexpectedError
 
@@ -305,3 +305,43 @@ class AsyncLolzteamMarketPayment(RequestsClient):
         if payments.values():
             return True
         return False
+
+    def __get_payment_comment(self, payment: dict) -> Optional[str]:
+        if payment.get("comment") is not None:
+            return payment["comment"]
+        data = payment.get("data")
+        if isinstance(data, dict):
+            return data.get("comment")
+        return None
+
+    async def check_status_payments(
+        self,
+        payments: Union[Dict[str, Union[int, float]], Iterable[Tuple[str, Union[int, float]]]],
+        max_pages: Optional[int] = 5,
+    ) -> Dict[str, bool]:
+        """Displays whether many transfers are paid or not, with one history scan instead of one request per transfer.
+
+        Recent "receiving_money" operations are loaded page by page into a comment index until every pending transfer is found.
+
+        :param payments: Dict of comment -> amount indicated in the transaction, or (comment, amount) pairs.
+        :param max_pages: Optional. Maximum number of history pages to scan. None - scan the whole history. Default is 5.
+
+        :return: Dict of comment -> True if payment has been received, otherwise False"""
+        pending = dict(payments)
+        result = dict.fromkeys(pending, False)
+        index: Dict[str, List[float]] = {}
+        page = 1
+        while pending:
+            history = await self.get_history_payments(operation_type="receiving_money", page=page)
+            for payment in (history.payments or {}).values():
+                comment = self.__get_payment_comment(payment)
+                if comment in pending:
+                    index.setdefault(comment, []).append(float(payment.get("incoming_sum") or 0))
+            for comment in [comment for comment in pending if comment in index]:
+                if float(pending[comment]) in index[comment]:
+                    result[comment] = True
+                    del pending[comment]
+            if not history.hasNextPage or (max_pages is not None and page >= max_pages):
+                break
+            page += 1
+        return result
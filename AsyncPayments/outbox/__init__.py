@@ -0,0 +1,2 @@
+from .outbox import PayoutOutbox
+from .models import OutboxItem, OutboxStates
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional, Any
+
+
+class OutboxStates:
+    PENDING: str = "pending"
+    SENDING: str = "sending"
+    CREATED: str = "created"
+    SUBMITTING: str = "submitting"
+    PROCESSING: str = "processing"
+    SENT: str = "sent"
+    FAILED: str = "failed"
+    UNKNOWN: str = "unknown"
+
+
+class OutboxItem(BaseModel):
+    key: Optional[str] = None
+    provider: Optional[str] = None
+    params: Optional[dict] = None
+    state: Optional[str] = None
+    attempts: Optional[int] = None
+    remote_id: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: Optional[float] = None
+    updated_at: Optional[float] = None
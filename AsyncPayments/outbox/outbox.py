@@ -0,0 +1,432 @@
+from ..ratelimit import RateLimiter
+from ..requests import is_transient
+from ..exceptions import BadRequest, RequestError
+from ..aaio import AsyncAaio
+from ..freeKassa import AsyncFreeKassa
+from ..ruKassa import AsyncRuKassa
+from ..payok import AsyncPayOK
+from ..cryptomus import AsyncCryptomus
+from ..cryptomus.models import PayoutStatuses
+from ..crystalPay import AsyncCrystalPay
+from .models import OutboxItem, OutboxStates
+from typing import Optional, Any, List, Dict, Tuple, Callable, Awaitable
+from concurrent.futures import ThreadPoolExecutor
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+# Client type, provider name, create method and the parameter that carries the outbox key.
+PROVIDERS: List[Tuple[type, str, str, Optional[str]]] = [
+    (AsyncAaio, "aaio", "create_withdrawal", "my_id"),
+    (AsyncFreeKassa, "freeKassa", "create_withdrawal", "paymentId"),
+    (AsyncRuKassa, "ruKassa", "create_withdraw", "orderId"),
+    (AsyncPayOK, "payok", "create_payout", None),
+    (AsyncCryptomus, "cryptomus", "create_payout", "order_id"),
+    (AsyncCrystalPay, "crystalPay", "create_payoff", "extra"),
+]
+
+# Providers whose payouts can be looked up by key, with their final success and failure statuses.
+LOOKUP_PROVIDERS: Dict[str, Tuple[tuple, tuple]] = {
+    "aaio": (("success",), ("cancel",)),
+    "freeKassa": ((1,), (8, 9)),
+    "cryptomus": ((PayoutStatuses.PAID,), (PayoutStatuses.FAIL, PayoutStatuses.CANCEL, PayoutStatuses.SYSTEM_FAIL)),
+    "crystalPay": (("payed",), ("failed", "canceled")),
+}
+
+# Error texts of Aaio and Cryptomus when no payout has the key.
+NOT_FOUND_MESSAGES = ("not found", "не найден")
+
+COLUMNS = ("key", "provider", "params", "state", "attempts", "remote_id", "result", "error", "created_at", "updated_at")
+
+
+class PayoutOutbox:
+
+    def __init__(self, path: str, workers: Optional[int] = 4, rate_limits: Optional[Dict[str, float]] = None,
+                 max_attempts: Optional[int] = 3, retry_delay: Optional[float] = 5.0,
+                 poll_interval: Optional[float] = 1.0) -> None:
+        """
+        Durable outbox for payouts: every payout is stored in SQLite before it is sent and sent by a worker pool.
+
+        States: pending -> sending -> sent or failed. CrystalPay payoffs go pending -> sending -> created ->
+        submitting -> sent. A payout found by a lookup that is not final yet is processing and is looked up
+        again until it is paid (sent) or rejected (failed). The key of an item is passed to the provider where
+        it accepts one: Aaio my_id, FreeKassa paymentId, RuKassa orderId, Cryptomus order_id and CrystalPay extra.
+
+        An item is in doubt when a request was interrupted, for example by a network error, a timeout, a 5xx
+        response or a crash, and the provider may or may not have made the payout. It is then looked up: Aaio
+        by my_id, FreeKassa by paymentId, Cryptomus by order_id and CrystalPay by payoff ID. A payout that the
+        provider reports as not found is sent again with the same key, and an item still not found after
+        max_attempts rounds or whose lookup fails with another error is unknown. A CrystalPay payoff that was
+        not submitted moves no money, so an interrupted create_payoff is simply sent again. Any other error
+        response fails the item, unless the payout was sent before: it is then looked up, as the rejection
+        may be of a duplicate key, and is unknown if it is not found.
+
+        Items left in sending or submitting state by a crash are resolved when the outbox starts. Use one
+        process per database file.
+
+        :param path: SQLite database file.
+        :param workers: Optional. Number of payouts sent at once. Default is 4.
+        :param rate_limits: Optional. Maximum requests per second by provider name, for example {"aaio": 1}.
+        :param max_attempts: Optional. Attempts to send or look up a payout before giving up. Default is 3.
+        :param retry_delay: Optional. Pause before the first retry in seconds, doubled on every next one. Default is 5.
+        :param poll_interval: Optional. Longest pause between checks for new items in seconds. Default is 1.
+        """
+        self.__path = path
+        self.__workers = workers
+        self.__limiters = {provider: RateLimiter(rate) for provider, rate in (rate_limits or {}).items()}
+        self.__max_attempts = max_attempts
+        self.__retry_delay = retry_delay
+        self.__poll_interval = poll_interval
+        self.__clients: Dict[str, Tuple[Any, str, Optional[str]]] = {}
+        self.__callbacks: List[Callable[[OutboxItem], Awaitable]] = []
+        self.__connection: Optional[sqlite3.Connection] = None
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__tasks: List[asyncio.Task] = []
+        self.__wakeup: Optional[asyncio.Event] = None
+
+    def add(self, client: Any, allow_unknown: Optional[bool] = False) -> str:
+        """Add a provider.
+
+        :param client: AsyncAaio, AsyncFreeKassa, AsyncCryptomus or AsyncCrystalPay. AsyncRuKassa and AsyncPayOK with allow_unknown.
+        :param allow_unknown: Optional. Allow a provider whose payouts cannot be looked up by key. Its in doubt items are marked unknown to be checked by hand. Default is False.
+        :return: Provider name used in enqueue()."""
+        for client_type, provider, method, key_param in PROVIDERS:
+            if isinstance(client, client_type):
+                if provider not in LOOKUP_PROVIDERS and not allow_unknown:
+                    raise ValueError(f'{provider} payouts cannot be looked up by key, pass allow_unknown=True to add it')
+                self.__clients[provider] = (client, method, key_param)
+                return provider
+        raise ValueError(f'Outbox is not supported for {type(client).__name__}')
+
+    def on_done(self, callback: Callable[[OutboxItem], Awaitable]) -> Callable[[OutboxItem], Awaitable]:
+        """Register an async callback called with every item that is sent, failed or unknown. Can be used as a decorator."""
+        self.__callbacks.append(callback)
+        return callback
+
+    def __connect(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            self.__connection = sqlite3.connect(self.__path, check_same_thread=False)
+            with self.__connection:
+                self.__connection.execute(
+                    "CREATE TABLE IF NOT EXISTS outbox (key TEXT PRIMARY KEY, provider TEXT NOT NULL, "
+                    "params TEXT NOT NULL, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                    "remote_id TEXT, result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+                    "next_at REAL NOT NULL DEFAULT 0)"
+                )
+                self.__connection.execute("CREATE INDEX IF NOT EXISTS outbox_state ON outbox (state, next_at)")
+        return self.__connection
+
+    @staticmethod
+    def __item(row: Optional[tuple]) -> Optional[OutboxItem]:
+        if row is None:
+            return None
+        item = dict(zip(COLUMNS, row))
+        item["params"] = json.loads(item["params"])
+        item["result"] = json.loads(item["result"]) if item["result"] is not None else None
+        return OutboxItem(**item)
+
+    def __select(self, key: str) -> Optional[OutboxItem]:
+        row = self.__connect().execute(f"SELECT {', '.join(COLUMNS)} FROM outbox WHERE key = ?", (key,)).fetchone()
+        return self.__item(row)
+
+    def __select_state(self, states: Tuple[str, ...]) -> List[OutboxItem]:
+        rows = self.__connect().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM outbox WHERE state IN ({', '.join('?' * len(states))}) "
+            f"ORDER BY created_at", states,
+        ).fetchall()
+        return [self.__item(row) for row in rows]
+
+    def __insert(self, key: str, provider: str, params: dict, now: float) -> OutboxItem:
+        connection = self.__connect()
+        with connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO outbox (key, provider, params, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, json.dumps(params), OutboxStates.PENDING, now, now),
+            )
+        return self.__select(key)
+
+    def __claim(self, providers: Tuple[str, ...], now: float, recheck_at: float) -> Optional[OutboxItem]:
+        connection = self.__connect()
+        with connection:
+            row = connection.execute(
+                f"SELECT key, state FROM outbox WHERE state IN (?, ?, ?) AND next_at <= ? "
+                f"AND provider IN ({', '.join('?' * len(providers))}) ORDER BY created_at LIMIT 1",
+                (OutboxStates.PENDING, OutboxStates.CREATED, OutboxStates.PROCESSING, now, *providers),
+            ).fetchone()
+            if row is None:
+                return None
+            key, state = row
+            if state == OutboxStates.PROCESSING:
+                # A lookup sends nothing, so the item keeps its state and is only hidden until the next check.
+                connection.execute("UPDATE outbox SET next_at = ? WHERE key = ?", (recheck_at, key))
+                return self.__select(key)
+            # The state is written before the request, so after a crash the item is known to be in doubt.
+            state = OutboxStates.SENDING if state == OutboxStates.PENDING else OutboxStates.SUBMITTING
+            connection.execute("UPDATE outbox SET state = ?, updated_at = ? WHERE key = ?", (state, now, key))
+        return self.__select(key)
+
+    def __update(self, key: str, fields: Dict[str, Any]) -> OutboxItem:
+        connection = self.__connect()
+        with connection:
+            connection.execute(
+                f"UPDATE outbox SET {', '.join(f'{name} = ?' for name in fields)} WHERE key = ?",
+                (*fields.values(), key),
+            )
+        return self.__select(key)
+
+    async def __run_in_db(self, function, *args):
+        if self.__executor is None:
+            # One thread keeps all SQLite calls in order without blocking the event loop.
+            self.__executor = ThreadPoolExecutor(max_workers=1)
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, function, *args)
+
+    async def enqueue(self, provider: str, key: str, **params: Any) -> OutboxItem:
+        """Store a payout. It is sent by a worker after it is stored.
+
+        Example: await outbox.enqueue("aaio", f"prize-{user_id}", method="qiwi", amount=100, wallet=wallet)
+
+        :param provider: Provider name returned by add().
+        :param key: Unique key of the payout in your system, letters, digits, _ and -. Enqueuing the same key again returns the stored item and sends nothing.
+        :param params: Arguments of create_withdrawal, create_withdraw, create_payout or create_payoff. The key parameter of the provider is filled in.
+        :return: Stored item."""
+        if provider not in self.__clients:
+            raise ValueError(f'Provider {provider} is not added')
+        key_param = self.__clients[provider][2]
+        if key_param is not None:
+            params.setdefault(key_param, key)
+        item = await self.__run_in_db(self.__insert, key, provider, params, time.time())
+        if self.__wakeup is not None:
+            self.__wakeup.set()
+        return item
+
+    async def get(self, key: str) -> Optional[OutboxItem]:
+        """Get a stored payout by key."""
+        return await self.__run_in_db(self.__select, key)
+
+    async def items(self, state: str) -> List[OutboxItem]:
+        """Get stored payouts in a state, for example OutboxStates.UNKNOWN, oldest first."""
+        return await self.__run_in_db(self.__select_state, (state,))
+
+    async def __set(self, item: OutboxItem, state: str, **fields: Any) -> OutboxItem:
+        fields["state"] = state
+        fields["updated_at"] = time.time()
+        if "result" in fields:
+            result = fields["result"]
+            fields["result"] = json.dumps(result.model_dump(mode="json") if hasattr(result, "model_dump") else result)
+        item = await self.__run_in_db(self.__update, item.key, fields)
+        if state in (OutboxStates.SENT, OutboxStates.FAILED, OutboxStates.UNKNOWN):
+            for callback in self.__callbacks:
+                try:
+                    await callback(item)
+                except Exception:
+                    logger.exception("Outbox callback %r failed for payout %s", callback, item.key)
+        return item
+
+    async def __call(self, provider: str, method: Callable[..., Awaitable], /, *args: Any, **kwargs: Any) -> Any:
+        limiter = self.__limiters.get(provider)
+        if limiter is not None:
+            await limiter.acquire()
+        return await method(*args, **kwargs)
+
+    @staticmethod
+    def __remote_id(provider: str, result: Any) -> Optional[str]:
+        if provider == "payok":
+            remote_id = result.payout.payout_id if result.payout else None
+        elif provider == "cryptomus":
+            remote_id = result.uuid
+        else:
+            remote_id = result.id
+        return str(remote_id) if remote_id is not None else None
+
+    async def __process(self, item: OutboxItem) -> None:
+        if item.state == OutboxStates.PROCESSING:
+            await self.__check(item)
+            return
+        client, method, _ = self.__clients[item.provider]
+        try:
+            if item.state == OutboxStates.SENDING:
+                result = await self.__call(item.provider, getattr(client, method), **item.params)
+                if item.provider != "crystalPay":
+                    await self.__set(item, OutboxStates.SENT, result=result,
+                                     remote_id=self.__remote_id(item.provider, result), error=None)
+                    return
+                # CrystalPay payoffs move money only after submit_payoff. The payoff ID is stored together
+                # with the submitting state, so no other worker can claim the item in between.
+                item = await self.__set(item, OutboxStates.SUBMITTING, result=result, remote_id=str(result.id))
+            result = await self.__call(item.provider, client.submit_payoff, item.remote_id)
+            await self.__set(item, OutboxStates.SENT, result=result, error=None)
+        except Exception as error:
+            if is_transient(error):
+                await self.__resolve(item, error)
+            elif item.attempts and not (item.provider == "crystalPay" and item.state == OutboxStates.SENDING):
+                # A payout sent again can be rejected as a duplicate of the first request that was made
+                # after all, so the rejection alone does not mean that nothing was paid out.
+                await self.__recheck(item, error)
+            else:
+                # Rejected by the provider or invalid arguments: nothing was paid out.
+                await self.__set(item, OutboxStates.FAILED, error=str(error) or type(error).__name__)
+
+    async def __look_up(self, item: OutboxItem) -> Tuple[Any, Any]:
+        """Status of the payout at the provider and the payout, or None and None if it was not created."""
+        client = self.__clients[item.provider][0]
+        key = item.params.get(self.__clients[item.provider][2])
+        try:
+            if item.provider == "aaio":
+                withdrawal = await self.__call(item.provider, client.get_withdrawal_info, key)
+                return withdrawal.status, withdrawal
+            if item.provider == "freeKassa":
+                withdrawals = await self.__call(item.provider, client.get_withdrawals, paymentId=key)
+                found = withdrawals.withdrawals[0] if withdrawals.withdrawals else None
+                return (found.status, found) if found is not None else (None, None)
+            if item.provider == "cryptomus":
+                payout = await self.__call(item.provider, client.payout_info, order_id=key)
+                return payout.status, payout
+            if item.state == OutboxStates.SENDING:
+                # The payoff ID is not known before create_payoff answers, and an unsubmitted payoff moves no money.
+                return None, None
+            payoff = await self.__call(item.provider, client.get_payoff, item.remote_id)
+            return payoff.state, payoff
+        except (BadRequest, RequestError) as error:
+            if self.__not_found(error):
+                return None, None
+            raise
+
+    @staticmethod
+    def __not_found(error: Exception) -> bool:
+        """Whether the provider answered that no payout has the key. Other errors, for example 401, say nothing."""
+        if getattr(error, "status", None) == 404:
+            return True
+        return not is_transient(error) and any(message in str(error).lower() for message in NOT_FOUND_MESSAGES)
+
+    def __state(self, item: OutboxItem, status: Any) -> Optional[str]:
+        """State of an item by the status of its payout, or None if it was not made."""
+        if status is None or (item.provider == "crystalPay" and status == "created"):
+            return None
+        paid, rejected = LOOKUP_PROVIDERS[item.provider]
+        if status in paid:
+            return OutboxStates.SENT
+        if status in rejected:
+            return OutboxStates.FAILED
+        return OutboxStates.PROCESSING
+
+    async def __found(self, item: OutboxItem, state: str, status: Any, result: Any, **fields: Any) -> None:
+        if state == OutboxStates.PROCESSING:
+            fields["next_at"] = time.time() + self.__retry_delay
+        await self.__set(item, state, result=result, remote_id=self.__remote_id(item.provider, result),
+                         error=f'Payout status: {status}' if state == OutboxStates.FAILED else None, **fields)
+
+    async def __check(self, item: OutboxItem) -> None:
+        try:
+            status, result = await self.__look_up(item)
+        except Exception:
+            # Not reachable: the item was hidden until the next check when it was claimed.
+            return
+        state = self.__state(item, status)
+        if state is None:
+            # The payout was found before, so it is not safe to send it again.
+            await self.__set(item, OutboxStates.UNKNOWN, error='Payout is no longer found')
+        elif state != OutboxStates.PROCESSING:
+            await self.__found(item, state, status, result)
+
+    async def __recheck(self, item: OutboxItem, error: Exception) -> None:
+        error = str(error) or type(error).__name__
+        try:
+            status, result = await self.__look_up(item)
+        except Exception:
+            status, result = None, None
+        state = self.__state(item, status)
+        if state is None:
+            await self.__set(item, OutboxStates.UNKNOWN, error=error)
+        else:
+            await self.__found(item, state, status, result)
+
+    async def __resolve(self, item: OutboxItem, error: Exception) -> None:
+        error = str(error) or type(error).__name__
+        attempts = item.attempts + 1
+        if item.provider not in LOOKUP_PROVIDERS:
+            await self.__set(item, OutboxStates.UNKNOWN, attempts=attempts, error=error)
+            return
+        for attempt in range(self.__max_attempts):
+            try:
+                status, result = await self.__look_up(item)
+            except Exception:
+                await asyncio.sleep(self.__retry_delay * 2 ** attempt)
+                continue
+            state = self.__state(item, status)
+            if state is not None:
+                await self.__found(item, state, status, result, attempts=attempts)
+            elif attempts >= self.__max_attempts:
+                # Not found yet, but a payout that timed out may still appear.
+                await self.__set(item, OutboxStates.UNKNOWN, attempts=attempts, error=error)
+            else:
+                # Not paid out: send it again with the same key after a pause.
+                state = OutboxStates.CREATED if item.state == OutboxStates.SUBMITTING else OutboxStates.PENDING
+                next_at = time.time() + self.__retry_delay * 2 ** (attempts - 1)
+                await self.__set(item, state, attempts=attempts, error=error, next_at=next_at)
+            return
+        await self.__set(item, OutboxStates.UNKNOWN, attempts=attempts, error=error)
+
+    async def __work(self) -> None:
+        while True:
+            try:
+                now = time.time()
+                item = await self.__run_in_db(self.__claim, tuple(self.__clients), now, now + self.__retry_delay)
+            except Exception:
+                logger.exception("Outbox could not claim a payout")
+                item = None
+            if item is None:
+                try:
+                    await asyncio.wait_for(self.__wakeup.wait(), self.__poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.__wakeup.clear()
+                continue
+            try:
+                await self.__process(item)
+            except Exception:
+                # The database failed: the item stays in doubt and is resolved on the next start.
+                logger.exception("Outbox failed to process payout %s", item.key)
+
+    async def start(self) -> None:
+        """Resolve items left in doubt by the previous run and start the workers."""
+        if self.__tasks:
+            return
+        in_doubt = await self.__run_in_db(self.__select_state, (OutboxStates.SENDING, OutboxStates.SUBMITTING))
+        in_doubt = [item for item in in_doubt if item.provider in self.__clients]
+        semaphore = asyncio.Semaphore(self.__workers)
+
+        async def resolve(item: OutboxItem) -> None:
+            async with semaphore:
+                await self.__resolve(item, RuntimeError("Interrupted by restart"))
+
+        await asyncio.gather(*[resolve(item) for item in in_doubt])
+        self.__wakeup = asyncio.Event()
+        self.__tasks = [asyncio.create_task(self.__work()) for _ in range(self.__workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers and close the database. A payout in flight is resolved on the next start."""
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        self.__tasks = []
+        if self.__connection is not None:
+            await self.__run_in_db(self.__connection.close)
+            self.__connection = None
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+
+    async def __aenter__(self) -> "PayoutOutbox":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
@@ -1,8 +1,9 @@
 from ..requests import RequestsClient
-from typing import Optional, Union, List
+from typing import Optional, Union, List, Set, Callable, AsyncIterator
 from .models import Balance, Transaction, Payout, CreatePayout, PayoutOnCreate
 from urllib.parse import urlencode
 import hashlib
+import hmac
 
 
 class AsyncPayOK(RequestsClient):
@@ -30,6 +31,17 @@ class AsyncPayOK(RequestsClient):
         if not self.__secretKey or not self.__apiKey or not self.__apiId or not self.__shopId:
             raise ValueError('No SecretKey, ApiKey, ShopID or ApiID specified')
 
+    def check_webhook_signature(self, data: dict) -> bool:
+        """Check the sign field of a payment notification.
+
+        :param data: Notification form fields.
+        :return: True if the notification was sent by PayOK for your shop."""
+        data_for_sign = '|'.join(map(str, [
+            self.__secretKey, data.get("desc"), data.get("currency"), data.get("shop"), data.get("payment_id"), data.get("amount"),
+        ]))
+        expected = hashlib.md5(data_for_sign.encode()).hexdigest()
+        return str(data.get("shop")) == str(self.__shopId) and hmac.compare_digest(expected, str(data.get("sign") or ""))
+
     async def get_balance(self) -> Balance:
         """Get your balance.
         
@@ -70,7 +82,7 @@ class AsyncPayOK(RequestsClient):
         
         return [Transaction(**transaction) for transaction in response.values()]
         
-    async def get_payouts(self, payout_id: Optional[int] = None, offset: Optional[int] = None):
+    async def get_payouts(self, payout_id: Optional[int] = None, offset: Optional[int] = None) -> Union[Payout, List[Payout]]:
         """Get list of payouts.
         
         Docs: https://payok.io/cabinet/documentation/doc_api_payout
@@ -93,6 +105,49 @@ class AsyncPayOK(RequestsClient):
         
         return [Payout(**payout) for payout in response.values()]
 
+    async def __iter_offsets(self, fetch: Callable, key: Callable, offset: int,
+                             seen: Optional[Set[str]]) -> AsyncIterator:
+        if seen is None:
+            seen = set()
+        while True:
+            page = await fetch(offset)
+            if not page:
+                return
+            offset += len(page)
+            for item in page:
+                if str(key(item)) in seen:
+                    continue
+                seen.add(str(key(item)))
+                yield item
+
+    def iter_transactions(self, offset: Optional[int] = 0,
+                          seen: Optional[Set[str]] = None) -> AsyncIterator[Transaction]:
+        """Iterate over all transactions, walking the offsets page by page.
+
+        New transactions shift older ones to later offsets while iterating, so already yielded transactions are skipped by their ID.
+
+        Docs: https://payok.io/cabinet/documentation/doc_api_transaction
+
+        :param offset: Optional. Offset to start from. To resume, pass the previous start offset plus the number of transactions already received. Default is 0.
+        :param seen: Optional. Set of already processed transaction IDs. It is updated in place, pass the same set when resuming to skip duplicates.
+        """
+        return self.__iter_offsets(lambda offset: self.get_transactions(offset=offset),
+                                   lambda transaction: transaction.transaction, offset, seen)
+
+    def iter_payouts(self, offset: Optional[int] = 0,
+                     seen: Optional[Set[str]] = None) -> AsyncIterator[Payout]:
+        """Iterate over all payouts, walking the offsets page by page.
+
+        New payouts shift older ones to later offsets while iterating, so already yielded payouts are skipped by their ID.
+
+        Docs: https://payok.io/cabinet/documentation/doc_api_payout
+
+        :param offset: Optional. Offset to start from. To resume, pass the previous start offset plus the number of payouts already received. Default is 0.
+        :param seen: Optional. Set of already processed payout IDs. It is updated in place, pass the same set when resuming to skip duplicates.
+        """
+        return self.__iter_offsets(lambda offset: self.get_payouts(offset=offset),
+                                   lambda payout: payout.payout, offset, seen)
+
     async def create_payout(
         self,
         amount: float,
@@ -57,4 +57,18 @@ class PayoutOnCreate(BaseModel):
 class CreatePayout(BaseModel):
     remain_balance: Optional[Union[str, int, float]] = None
     payout: Optional[PayoutOnCreate] = None
-    
\ No newline at end of file
+    
+
+class Notification(BaseModel):
+    payment_id: Optional[Union[int, str]] = None
+    shop: Optional[Union[int, str]] = None
+    amount: Optional[Union[float, str]] = None
+    profit: Optional[Union[float, str]] = None
+    desc: Optional[str] = None
+    currency: Optional[str] = None
+    currency_amount: Optional[Union[float, str]] = None
+    sign: Optional[str] = None
+    email: Optional[str] = None
+    date: Optional[str] = None
+    method: Optional[str] = None
+    custom: Optional[Union[dict, str]] = None
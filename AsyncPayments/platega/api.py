@@ -1,8 +1,11 @@
 from ..requests import RequestsClient
-from typing import Optional, Union
-from .models import Order, OrderInfo, ExchangeRate
-from urllib.parse import urlencode
+from typing import Optional, Union, AsyncIterator
+from .models import Order, OrderInfo, ExchangeRate, BalanceUnlockOperation, BalanceUnlockOperations
+from urllib.parse import urlencode, unquote
+from datetime import datetime, timezone
+import asyncio
 import json
+import hmac
 
 class AsyncPlatega(RequestsClient):
     API_HOST: str = "https://platega.io/"
@@ -30,6 +33,15 @@ class AsyncPlatega(RequestsClient):
     def check_values(self):
         if not self.__secret_key or not self.__merchant_id:
             raise ValueError('No SecretKey or MerchantID specified')
+
+    def check_webhook_signature(self, merchant_id: str, secret: str) -> bool:
+        """Check the X-MerchantId and X-Secret headers of a callback.
+
+        :param merchant_id: Value of the X-MerchantId header.
+        :param secret: Value of the X-Secret header.
+        :return: True if the callback was sent with your credentials."""
+        return hmac.compare_digest(str(merchant_id or ""), str(self.__merchant_id)) & \
+            hmac.compare_digest(secret or "", self.__secret_key)
         
     async def create_order(
         self,
@@ -119,25 +131,39 @@ class AsyncPlatega(RequestsClient):
         )
         return ExchangeRate(**response)
     
-    async def get_orders(self, date_from: str, date_to: str, page: str, size: str):
+    def __format_date(self, date: Union[str, datetime]) -> str:
+        if isinstance(date, datetime):
+            if date.tzinfo:
+                date = date.astimezone(timezone.utc)
+            return date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return unquote(date)
+
+    async def get_orders(
+        self,
+        date_from: Union[str, datetime],
+        date_to: Union[str, datetime],
+        page: Union[int, str] = 1,
+        size: Union[int, str] = 20,
+    ) -> BalanceUnlockOperations:
         """Method for receiving conversions.
         
-        :param date_from: Date from. Example: 2025-01-01T00%3A00%3A00Z.
-        :param date_to: Date to. Example: 2025-11-13T23%3A59%3A59Z.
-        :param page: Page number. Example: 1.
-        :param size: Size. Example: 20.
+        :param date_from: Date from. Example: datetime(2025, 1, 1) or 2025-01-01T00:00:00Z.
+        :param date_to: Date to. Example: datetime(2025, 11, 13, 23, 59, 59) or 2025-11-13T23:59:59Z.
+        :param page: Page number. Default is 1.
+        :param size: Page size. Default is 20.
+        :return: BalanceUnlockOperations. Earlier versions returned the response dict, use model_dump() where a dict is still needed.
         
         Docs: https://docs.platega.io/%D0%BF%D0%BE%D0%BB%D1%83%D1%87%D0%B5%D0%BD%D0%B8%D0%B5-%D0%BA%D1%83%D1%80%D1%81%D0%BE%D0%B2-%D0%BF%D0%BE-%D0%BF%D0%BB%D0%B0%D1%82%D0%B5%D0%B6%D0%BD%D0%BE%D0%BC%D1%83-%D0%BC%D0%B5%D1%82%D0%BE%D0%B4%D1%83-22645078e0
         """
         params = {
-            "from": date_from,
-            "to": date_to,
-            "page": page,
-            "size": size,
+            "from": self.__format_date(date_from),
+            "to": self.__format_date(date_to),
+            "page": int(page),
+            "size": int(size),
         }
         url = f"{self.__base_url}/transaction/balance-unlock-operations"
         
-        new_headers = self.__headers
+        new_headers = dict(self.__headers)
         new_headers['accept'] = "text/plain"
         
         response = await self._request(
@@ -147,5 +173,46 @@ class AsyncPlatega(RequestsClient):
             headers=new_headers,
             data=urlencode(params),
         )
-        return response
-        
\ No newline at end of file
+        if isinstance(response, list):
+            return BalanceUnlockOperations(items=response, page=params["page"], size=params["size"])
+        return BalanceUnlockOperations(**response)
+
+    async def iter_orders(
+        self,
+        date_from: Union[str, datetime],
+        date_to: Union[str, datetime],
+        size: int = 100,
+        concurrency: int = 1,
+    ) -> AsyncIterator[BalanceUnlockOperation]:
+        """Iterate over all conversions in the period, page by page.
+
+        The first page is requested alone. If it reports the total, the remaining pages are requested
+        concurrency at a time, otherwise one by one until a short page.
+
+        :param date_from: Date from. Example: datetime(2025, 1, 1) or 2025-01-01T00:00:00Z.
+        :param date_to: Date to. Example: datetime(2025, 1, 31, 23, 59, 59) or 2025-01-31T23:59:59Z.
+        :param size: Optional. Page size. Default is 100.
+        :param concurrency: Optional. How many pages are requested at once when the total is known. Default is 1.
+        """
+        if size < 1 or concurrency < 1:
+            raise ValueError('Size and concurrency must be at least 1')
+        result = await self.get_orders(date_from, date_to, 1, size)
+        for operation in result.items or []:
+            yield operation
+        if result.total is not None:
+            last_page = (result.total + size - 1) // size
+            for page in range(2, last_page + 1, concurrency):
+                results = await asyncio.gather(*[
+                    self.get_orders(date_from, date_to, number, size)
+                    for number in range(page, min(page + concurrency, last_page + 1))
+                ])
+                for result in results:
+                    for operation in result.items or []:
+                        yield operation
+            return
+        page = 1
+        while len(result.items or []) >= size:
+            page += 1
+            result = await self.get_orders(date_from, date_to, page, size)
+            for operation in result.items or []:
+                yield operation
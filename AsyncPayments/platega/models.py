@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Union
+from typing import Optional, Union, List
 
 
 class OrderStatuses:
@@ -46,4 +46,33 @@ class ExchangeRate(BaseModel):
     currencyFrom: Optional[str] = None
     currencyTo: Optional[str] = None
     rate: Optional[float] = None
-    updatedAt: Optional[str] = None
\ No newline at end of file
+    updatedAt: Optional[str] = None
+    
+    
+class BalanceUnlockOperation(BaseModel):
+    id: Optional[str] = None
+    transactionId: Optional[str] = None
+    paymentMethod: Optional[Union[int, str]] = None
+    amount: Optional[Union[int, float]] = None
+    currency: Optional[str] = None
+    amountUsdt: Optional[Union[int, float]] = None
+    rate: Optional[Union[int, float]] = None
+    status: Optional[str] = None
+    createdAt: Optional[str] = None
+    unlockedAt: Optional[str] = None
+    
+    
+class BalanceUnlockOperations(BaseModel):
+    items: Optional[List[BalanceUnlockOperation]] = []
+    page: Optional[int] = None
+    size: Optional[int] = None
+    total: Optional[int] = None
+
+
+class Callback(BaseModel):
+    id: Optional[str] = None
+    amount: Optional[Union[int, float]] = None
+    currency: Optional[str] = None
+    status: Optional[str] = None
+    paymentMethod: Optional[Union[int, str]] = None
+    payload: Optional[str] = None
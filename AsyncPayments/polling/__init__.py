@@ -0,0 +1,3 @@
+from .poller import PaymentPoller
+from .models import PendingPayment, PollStatuses
+from .checks import yoomoney_check, lolz_check, apays_check, rukassa_check, aaio_check, cryptomus_check, platega_check, YoomoneyBatchCheck
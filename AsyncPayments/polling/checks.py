@@ -0,0 +1,133 @@
+from ..yoomoney import AsyncYoomoney
+from ..lolz import AsyncLolzteamMarketPayment
+from ..apays import AsyncAPays
+from ..ruKassa import AsyncRuKassa
+from ..aaio import AsyncAaio
+from ..cryptomus import AsyncCryptomus
+from ..platega import AsyncPlatega
+from .models import PollStatuses
+from typing import Optional, Union, Dict, Set, Callable, Awaitable
+
+import asyncio
+
+
+def yoomoney_check(client: AsyncYoomoney, label: str) -> Callable[[], Awaitable[str]]:
+    """Status check for a YooMoney payment by label, see AsyncYoomoney.check_yoomoney_payment()."""
+    async def check() -> str:
+        if await client.check_yoomoney_payment(label):
+            return PollStatuses.PAID
+        return PollStatuses.PENDING
+    return check
+
+
+def lolz_check(client: AsyncLolzteamMarketPayment, pay_amount: int, comment: str) -> Callable[[], Awaitable[str]]:
+    """Status check for a Lolzteam Market transfer, see AsyncLolzteamMarketPayment.check_status_payment()."""
+    async def check() -> str:
+        if await client.check_status_payment(pay_amount, comment):
+            return PollStatuses.PAID
+        return PollStatuses.PENDING
+    return check
+
+
+def apays_check(client: AsyncAPays, order_id: str) -> Callable[[], Awaitable[str]]:
+    """Status check for an APays order, see AsyncAPays.get_order()."""
+    statuses = {
+        "approve": PollStatuses.PAID,
+        "decline": PollStatuses.FAILED,
+        "expired": PollStatuses.EXPIRED,
+    }
+
+    async def check() -> str:
+        order = await client.get_order(order_id)
+        return statuses.get(order.order_status, PollStatuses.PENDING)
+    return check
+
+
+def rukassa_check(client: AsyncRuKassa, payment_id: int) -> Callable[[], Awaitable[str]]:
+    """Status check for a RuKassa payment, see AsyncRuKassa.get_info_payment()."""
+    statuses = {
+        "PAID": PollStatuses.PAID,
+        "CANCEL": PollStatuses.FAILED,
+    }
+
+    async def check() -> str:
+        payment = await client.get_info_payment(payment_id)
+        return statuses.get(payment.status, PollStatuses.PENDING)
+    return check
+
+
+def aaio_check(client: AsyncAaio, order_id: Union[int, str]) -> Callable[[], Awaitable[str]]:
+    """Status check for an Aaio order, see AsyncAaio.get_order_info()."""
+    statuses = {
+        "success": PollStatuses.PAID,
+        "expired": PollStatuses.EXPIRED,
+    }
+
+    async def check() -> str:
+        order = await client.get_order_info(order_id)
+        return statuses.get(order.status, PollStatuses.PENDING)
+    return check
+
+
+def cryptomus_check(client: AsyncCryptomus, uuid: str) -> Callable[[], Awaitable[str]]:
+    """Status check for a Cryptomus invoice, see AsyncCryptomus.payment_info()."""
+    statuses = {
+        "paid": PollStatuses.PAID,
+        "paid_over": PollStatuses.PAID,
+        "fail": PollStatuses.FAILED,
+        "system_fail": PollStatuses.FAILED,
+        "wrong_amount": PollStatuses.FAILED,
+        "cancel": PollStatuses.EXPIRED,
+    }
+
+    async def check() -> str:
+        payment = await client.payment_info(uuid=uuid)
+        return statuses.get(payment.payment_status or payment.status, PollStatuses.PENDING)
+    return check
+
+
+def platega_check(client: AsyncPlatega, transaction_id: str) -> Callable[[], Awaitable[str]]:
+    """Status check for a Platega transaction, see AsyncPlatega.get_order()."""
+    statuses = {
+        "CONFIRMED": PollStatuses.PAID,
+        "CANCELED": PollStatuses.FAILED,
+        "CHARGEBACKED": PollStatuses.FAILED,
+    }
+
+    async def check() -> str:
+        order = await client.get_order(transaction_id)
+        return statuses.get(order.status, PollStatuses.PENDING)
+    return check
+
+
+class YoomoneyBatchCheck:
+
+    def __init__(self, client: AsyncYoomoney, window: Optional[float] = 0.5) -> None:
+        """
+        Status checks for many YooMoney labels that share one operation history scan.
+
+        Checks made within window seconds are answered by one AsyncYoomoney.check_yoomoney_payments() call.
+
+        :param client: YooMoney API client.
+        :param window: Optional. Time window in seconds to collect checks. Default is 0.5.
+        """
+        self.__client = client
+        self.__window = window
+        self.__labels: Set[str] = set()
+        self.__scan: Optional[asyncio.Future] = None
+
+    async def __run(self) -> Dict[str, bool]:
+        await asyncio.sleep(self.__window)
+        labels, self.__labels, self.__scan = self.__labels, set(), None
+        return await self.__client.check_yoomoney_payments(labels)
+
+    def check(self, label: str) -> Callable[[], Awaitable[str]]:
+        """Status check for a YooMoney payment by label."""
+        async def check() -> str:
+            self.__labels.add(label)
+            if self.__scan is None:
+                self.__scan = asyncio.ensure_future(self.__run())
+            # Shield the shared scan, a cancelled check must not cancel it for the others.
+            results = await asyncio.shield(self.__scan)
+            return PollStatuses.PAID if results.get(label) else PollStatuses.PENDING
+        return check
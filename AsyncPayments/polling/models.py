@@ -0,0 +1,31 @@
+from typing import Optional, Callable, Awaitable
+
+
+class PollStatuses:
+    PENDING: str = "pending"
+    PAID: str = "paid"
+    FAILED: str = "failed"
+    EXPIRED: str = "expired"
+
+
+class PendingPayment:
+
+    def __init__(self, key: str, provider: str, check: Callable[[], Awaitable[str]],
+                 created_at: float, expires_at: Optional[float] = None) -> None:
+        """
+        Payment watched by PaymentPoller.
+
+        :param key: Payment key in your system.
+        :param provider: Provider name, used for rate limiting.
+        :param check: Coroutine function returning one of PollStatuses.
+        :param created_at: Unix time of creation.
+        :param expires_at: Optional. Unix time after which the payment is considered expired.
+        """
+        self.key = key
+        self.provider = provider
+        self.check = check
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.status = PollStatuses.PENDING
+        self.attempts = 0
+        self.error: Optional[Exception] = None
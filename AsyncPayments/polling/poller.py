@@ -0,0 +1,170 @@
+from ..ratelimit import RateLimiter
+from .models import PendingPayment, PollStatuses
+from typing import Optional, Union, List, Dict, Callable, Awaitable
+from datetime import datetime
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentPoller:
+
+    def __init__(self, min_interval: Optional[float] = 2.0, max_interval: Optional[float] = 60.0,
+                 backoff: Optional[float] = 1.5, rate_limits: Optional[Dict[str, float]] = None) -> None:
+        """
+        Poll pending payments from one scheduler task instead of a loop per payment.
+
+        A new payment is checked after min_interval, every next check waits backoff times longer, up to
+        max_interval. A payment still pending at its expiry time is reported as expired and dropped.
+
+        :param min_interval: Optional. Pause before the first check in seconds. Default is 2.
+        :param max_interval: Optional. Longest pause between checks in seconds. Default is 60.
+        :param backoff: Optional. Growth factor of the pause after every check. Default is 1.5.
+        :param rate_limits: Optional. Maximum checks per second by provider name, for example {"lolz": 0.5}.
+        """
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__backoff = backoff
+        self.__limiters = {provider: RateLimiter(rate) for provider, rate in (rate_limits or {}).items()}
+        self.__payments: Dict[str, PendingPayment] = {}
+        self.__queue: List[tuple] = []
+        self.__counter = itertools.count()
+        self.__callbacks: Dict[str, List[Callable[[PendingPayment], Awaitable]]] = {
+            PollStatuses.PAID: [],
+            PollStatuses.FAILED: [],
+            PollStatuses.EXPIRED: [],
+        }
+        self.__task: Optional[asyncio.Task] = None
+        self.__wakeup: Optional[asyncio.Event] = None
+        self.__checks: set = set()
+
+    @property
+    def pending(self) -> List[PendingPayment]:
+        return list(self.__payments.values())
+
+    def add(self, key: str, provider: str, check: Callable[[], Awaitable[str]],
+            expires_in: Optional[float] = None,
+            expires_at: Optional[Union[float, datetime]] = None,
+            first_check_in: Optional[float] = None) -> PendingPayment:
+        """Start polling a payment.
+
+        Use the invoice lifetime as expires_in, for example CryptoBot expires_in (seconds) or CrystalPay lifetime * 60 (minutes).
+
+        :param key: Payment key in your system. Adding the same key again replaces the payment.
+        :param provider: Provider name, used for rate limiting.
+        :param check: Coroutine function returning one of PollStatuses, see AsyncPayments.polling.checks.
+        :param expires_in: Optional. Seconds from now until the payment expires.
+        :param expires_at: Optional. Unix time or datetime when the payment expires.
+        :param first_check_in: Optional. Seconds before the first check, for example while waiting for a webhook. Default is min_interval.
+        """
+        now = time.time()
+        if isinstance(expires_at, datetime):
+            expires_at = expires_at.timestamp()
+        if expires_in is not None:
+            expires_at = now + expires_in
+        payment = PendingPayment(key, provider, check, now, expires_at)
+        self.__payments[key] = payment
+        self.__schedule(payment, self.__min_interval if first_check_in is None else first_check_in)
+        return payment
+
+    def remove(self, key: str) -> None:
+        """Stop polling a payment.
+
+        :param key: Payment key in your system."""
+        self.__payments.pop(key, None)
+
+    def on_paid(self, callback: Callable[[PendingPayment], Awaitable]) -> Callable[[PendingPayment], Awaitable]:
+        """Register an async callback called with every paid payment. Can be used as a decorator."""
+        self.__callbacks[PollStatuses.PAID].append(callback)
+        return callback
+
+    def on_failed(self, callback: Callable[[PendingPayment], Awaitable]) -> Callable[[PendingPayment], Awaitable]:
+        """Register an async callback called with every failed payment. Can be used as a decorator."""
+        self.__callbacks[PollStatuses.FAILED].append(callback)
+        return callback
+
+    def on_expired(self, callback: Callable[[PendingPayment], Awaitable]) -> Callable[[PendingPayment], Awaitable]:
+        """Register an async callback called with every expired payment. Can be used as a decorator."""
+        self.__callbacks[PollStatuses.EXPIRED].append(callback)
+        return callback
+
+    def __schedule(self, payment: PendingPayment, delay: float) -> None:
+        due = time.time() + delay
+        if payment.expires_at is not None:
+            due = min(due, payment.expires_at)
+        heapq.heappush(self.__queue, (due, next(self.__counter), payment))
+        if self.__wakeup is not None:
+            self.__wakeup.set()
+
+    async def __check(self, payment: PendingPayment) -> None:
+        limiter = self.__limiters.get(payment.provider)
+        if limiter is not None:
+            await limiter.acquire()
+        if self.__payments.get(payment.key) is not payment:
+            return
+        payment.attempts += 1
+        try:
+            status = await payment.check()
+            payment.error = None
+        except Exception as error:
+            status, payment.error = PollStatuses.PENDING, error
+        if self.__payments.get(payment.key) is not payment:
+            return
+        if status == PollStatuses.PENDING and payment.expires_at is not None and time.time() >= payment.expires_at:
+            status = PollStatuses.EXPIRED
+        if status == PollStatuses.PENDING:
+            delay = min(self.__min_interval * self.__backoff ** payment.attempts, self.__max_interval)
+            self.__schedule(payment, delay)
+            return
+        payment.status = status
+        del self.__payments[payment.key]
+        for callback in self.__callbacks.get(status, []):
+            try:
+                await callback(payment)
+            except Exception:
+                logger.exception("Payment callback %r failed for payment %s", callback, payment.key)
+
+    async def __run(self) -> None:
+        while True:
+            now = time.time()
+            while self.__queue and self.__queue[0][0] <= now:
+                _, _, payment = heapq.heappop(self.__queue)
+                if self.__payments.get(payment.key) is payment:
+                    task = asyncio.create_task(self.__check(payment))
+                    self.__checks.add(task)
+                    task.add_done_callback(self.__checks.discard)
+            self.__wakeup.clear()
+            timeout = self.__queue[0][0] - now if self.__queue else None
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Start polling in a background task."""
+        if self.__task is None or self.__task.done():
+            self.__wakeup = asyncio.Event()
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Stop polling. Checks already in progress are cancelled."""
+        tasks = list(self.__checks)
+        if self.__task is not None:
+            tasks.append(self.__task)
+            self.__task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> "PaymentPoller":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
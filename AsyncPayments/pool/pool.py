@@ -0,0 +1,196 @@
+from ..cryptoBot import AsyncCryptoBot
+from ..xrocket import AsyncXRocket
+from typing import Optional, Union, Any, List, Dict, Tuple, Set, Callable, Awaitable
+from collections import deque
+
+import asyncio
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class InvoicePool:
+
+    def __init__(self, client: Union[AsyncCryptoBot, AsyncXRocket], size: Optional[int] = 5,
+                 expires_in: Optional[int] = 3600, retire_before: Optional[float] = 300.0,
+                 interval: Optional[float] = 10.0, concurrency: Optional[int] = 5,
+                 on_error: Optional[Callable[[Exception], Awaitable]] = None) -> None:
+        """
+        Stock of pre-created invoices for fixed prices, so checkout takes an invoice without a request.
+
+        Every price added with add() is kept at size invoices by a background task. Invoices are deleted
+        with delete_invoice retire_before seconds before they expire and replaced by new ones. Pooled
+        invoices are created ahead of time, so they cannot carry a payload of the buyer: match payments
+        by invoice ID instead.
+
+        :param client: AsyncCryptoBot or AsyncXRocket.
+        :param size: Optional. Default number of invoices kept per price. Default is 5.
+        :param expires_in: Optional. Lifetime of pooled invoices in seconds. Default is 3600.
+        :param retire_before: Optional. Seconds before expiry when an unused invoice is deleted. Default is 300.
+        :param interval: Optional. Longest pause between refills in seconds. A take() triggers a refill at once. Default is 10.
+        :param concurrency: Optional. Maximum number of create and delete requests in flight. Default is 5.
+        :param on_error: Optional. Async callback called with the error if a background create or delete fails. Default is to log the error.
+        """
+        if not isinstance(client, (AsyncCryptoBot, AsyncXRocket)):
+            raise ValueError(f'Invoice pool is not supported for {type(client).__name__}')
+        if retire_before >= expires_in:
+            raise ValueError('retire_before must be less than expires_in')
+        self.__client = client
+        self.__size = size
+        self.__expires_in = expires_in
+        self.__retire_before = retire_before
+        self.__interval = interval
+        self.__concurrency = concurrency
+        self.__on_error = on_error
+        self.__sizes: Dict[Tuple[float, str], int] = {}
+        self.__params: Dict[Tuple[float, str], dict] = {}
+        # Invoices of a price in creation order, so the ones expiring first are on the left.
+        self.__stock: Dict[Tuple[float, str], deque] = {}
+        self.__retired: List[Any] = []
+        self.__creating: Set[asyncio.Task] = set()
+        self.__task: Optional[asyncio.Task] = None
+        self.__wakeup: Optional[asyncio.Event] = None
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def __key(amount: Union[int, float], asset: str) -> Tuple[float, str]:
+        return float(amount), asset.upper()
+
+    def add(self, amount: Union[int, float], asset: str, size: Optional[int] = None, **params: Any) -> None:
+        """Keep invoices of a price in stock.
+
+        Example: pool.add(4.99, "USDT", description="Premium for 1 month")
+
+        :param amount: Invoice amount.
+        :param asset: CryptoBot asset or XRocket currency, for example USDT.
+        :param size: Optional. Number of invoices kept. Default is the size of the pool.
+        :param params: Other create_invoice arguments, for example description or paid_btn_url."""
+        key = self.__key(amount, asset)
+        self.__sizes[key] = self.__size if size is None else size
+        self.__params[key] = params
+        self.__stock.setdefault(key, deque())
+        self.__refill_now()
+
+    def available(self, amount: Union[int, float], asset: str) -> int:
+        """Number of invoices of a price in stock."""
+        return len(self.__stock.get(self.__key(amount, asset), ()))
+
+    def __refill_now(self) -> None:
+        if self.__wakeup is not None:
+            self.__wakeup.set()
+
+    async def __create(self, key: Tuple[float, str]) -> Tuple[float, Any]:
+        amount, asset = key
+        expires_at = time.monotonic() + self.__expires_in
+        if isinstance(self.__client, AsyncCryptoBot):
+            invoice = await self.__client.create_invoice(amount, asset=asset, expires_in=self.__expires_in,
+                                                         **self.__params.get(key, {}))
+        else:
+            invoice = await self.__client.create_invoice(1, asset, amount=amount, expiredIn=self.__expires_in,
+                                                         **self.__params.get(key, {}))
+        return expires_at, invoice
+
+    async def __delete(self, invoice: Any) -> None:
+        invoice_id = invoice.invoice_id if isinstance(self.__client, AsyncCryptoBot) else invoice.id
+        await self.__client.delete_invoice(invoice_id)
+
+    async def __bounded(self, call: Callable[[], Awaitable]) -> None:
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.__concurrency)
+        async with self.__semaphore:
+            try:
+                await call()
+            except Exception as error:
+                await self.__report(error)
+
+    async def __report(self, error: Exception) -> None:
+        if self.__on_error is not None:
+            await self.__on_error(error)
+        else:
+            logger.error("Invoice pool request failed", exc_info=error)
+
+    async def __stock_one(self, key: Tuple[float, str]) -> None:
+        self.__stock[key].append(await self.__create(key))
+
+    async def __refill_one(self, key: Tuple[float, str]) -> None:
+        # Shielded, so an invoice created while the pool stops still reaches the stock and is deleted.
+        task = asyncio.ensure_future(self.__stock_one(key))
+        self.__creating.add(task)
+        task.add_done_callback(self.__creating.discard)
+        await asyncio.shield(task)
+
+    async def refill(self) -> None:
+        """Delete invoices close to expiry and create invoices up to the stock size now."""
+        deadline = time.monotonic() + self.__retire_before
+        calls = [lambda invoice=invoice: self.__delete(invoice) for invoice in self.__retired]
+        self.__retired = []
+        for key, stock in self.__stock.items():
+            while stock and stock[0][0] <= deadline:
+                calls.append(lambda invoice=stock.popleft()[1]: self.__delete(invoice))
+            missing = self.__sizes.get(key, 0) - len(stock)
+            calls += [lambda key=key: self.__refill_one(key)] * max(0, missing)
+        await asyncio.gather(*[self.__bounded(call) for call in calls])
+
+    async def take(self, amount: Union[int, float], asset: str) -> Any:
+        """Take an invoice of a price out of the stock. The invoice is created now only if the stock is empty.
+
+        :param amount: Invoice amount.
+        :param asset: CryptoBot asset or XRocket currency.
+        :return: CryptoBot or XRocket Invoice. It is never handed out twice."""
+        key = self.__key(amount, asset)
+        stock = self.__stock.get(key)
+        deadline = time.monotonic() + self.__retire_before
+        invoice = None
+        while stock:
+            expires_at, candidate = stock.popleft()
+            if expires_at > deadline:
+                invoice = candidate
+                break
+            self.__retired.append(candidate)
+        self.__refill_now()
+        if invoice is None:
+            invoice = (await self.__create(key))[1]
+        return invoice
+
+    async def __run(self) -> None:
+        while True:
+            self.__wakeup.clear()
+            await self.refill()
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), self.__interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Fill the stock and keep it filled in a background task."""
+        if self.__task is None or self.__task.done():
+            self.__wakeup = asyncio.Event()
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self, delete: Optional[bool] = True) -> None:
+        """Stop refilling. Invoices being created are waited for.
+
+        :param delete: Optional. Delete the invoices left in stock. Default is True."""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+        for result in await asyncio.gather(*self.__creating, return_exceptions=True):
+            if isinstance(result, Exception):
+                await self.__report(result)
+        if delete:
+            invoices = self.__retired + [invoice for stock in self.__stock.values() for _, invoice in stock]
+            self.__retired = []
+            for stock in self.__stock.values():
+                stock.clear()
+            await asyncio.gather(*[self.__bounded(lambda invoice=invoice: self.__delete(invoice))
+                                   for invoice in invoices])
+
+    async def __aenter__(self) -> "InvoicePool":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
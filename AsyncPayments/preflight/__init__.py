@@ -0,0 +1,2 @@
+from .validator import Preflight
+from .models import Limit, LimitKinds
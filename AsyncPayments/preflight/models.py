@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Optional, Union
+
+
+class LimitKinds:
+    PAYMENT: str = "payment"
+    PAYOUT: str = "payout"
+
+
+class Limit(BaseModel):
+    provider: Optional[str] = None
+    kind: Optional[str] = None
+    method: Optional[str] = None
+    currency: Optional[str] = None
+    network: Optional[str] = None
+    enabled: Optional[bool] = True
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    fee_percent: Optional[float] = None
+    fee_fixed: Optional[float] = None
+
+    def fee(self, amount: Union[int, float]) -> float:
+        """Expected provider fee for an amount."""
+        return round(float(amount) * (self.fee_percent or 0) / 100 + (self.fee_fixed or 0), 8)
@@ -0,0 +1,270 @@
+from ..exceptions import PreflightError
+from ..cryptomus import AsyncCryptomus
+from ..freeKassa import AsyncFreeKassa
+from ..aaio import AsyncAaio
+from ..crystalPay import AsyncCrystalPay
+from ..xrocket import AsyncXRocket
+from .models import Limit, LimitKinds
+from typing import Optional, Union, Any, List, Dict, Tuple, Callable, Awaitable
+
+import asyncio
+import time
+
+
+def _float(value: Any) -> Optional[float]:
+    return None if value in (None, "") else float(value)
+
+
+def _upper(value: Optional[str]) -> Optional[str]:
+    return value.upper() if value else None
+
+
+async def _cryptomus_limits(client: AsyncCryptomus) -> List[Limit]:
+    payments, payouts = await asyncio.gather(client.list_of_services(), client.list_of_services_payout())
+    limits = []
+    for kind, services in ((LimitKinds.PAYMENT, payments), (LimitKinds.PAYOUT, payouts)):
+        for service in services:
+            limits.append(Limit(
+                provider="cryptomus", kind=kind, currency=service.currency, network=service.network,
+                enabled=service.is_available,
+                min_amount=_float(service.limit.min_amount) if service.limit else None,
+                max_amount=_float(service.limit.max_amount) if service.limit else None,
+                fee_percent=_float(service.commission.percent) if service.commission else None,
+                fee_fixed=_float(service.commission.fee_amount) if service.commission else None,
+            ))
+    return limits
+
+
+async def _freekassa_limits(client: AsyncFreeKassa) -> List[Limit]:
+    currencies, withdrawal_currencies = await asyncio.gather(
+        client.get_list_of_currencies(), client.get_list_of_currencies_for_withdrawal(),
+    )
+    limits = [
+        Limit(provider="freeKassa", kind=LimitKinds.PAYMENT, method=str(currency.id), currency=currency.currency,
+              enabled=bool(currency.is_enabled))
+        for currency in currencies
+    ]
+    limits += [
+        Limit(provider="freeKassa", kind=LimitKinds.PAYOUT, method=str(currency.id), currency=currency.currency,
+              min_amount=_float(currency.min), max_amount=_float(currency.max))
+        for currency in withdrawal_currencies
+    ]
+    return limits
+
+
+async def _aaio_limits(client: AsyncAaio) -> List[Limit]:
+    order_methods, withdrawal_methods = await asyncio.gather(client.get_order_methods(), client.get_withdrawal_methods())
+    limits = []
+    for method in order_methods:
+        # Order limits are given per currency.
+        for currency in ("RUB", "UAH", "USD", "EUR"):
+            limits.append(Limit(
+                provider="aaio", kind=LimitKinds.PAYMENT, method=method.code, currency=currency,
+                min_amount=getattr(method.min, currency, None) if method.min else None,
+                max_amount=getattr(method.max, currency, None) if method.max else None,
+                fee_percent=method.commission_percent,
+            ))
+    limits += [
+        Limit(provider="aaio", kind=LimitKinds.PAYOUT, method=method.code, min_amount=method.min,
+              max_amount=method.max, fee_percent=method.commission_percent, fee_fixed=method.commission_sum)
+        for method in withdrawal_methods
+    ]
+    return limits
+
+
+async def _crystalpay_limits(client: AsyncCrystalPay) -> List[Limit]:
+    methods = await client.get_payment_methods()
+    limits = []
+    for name, method in (methods or {}).items():
+        fee_percent = (_float(method.get("commission_percent")) or 0) + (_float(method.get("extra_commission_percent")) or 0)
+        limits.append(Limit(
+            provider="crystalPay", kind=LimitKinds.PAYMENT, method=name, currency=method.get("currency"),
+            enabled=bool(method.get("enabled", True)), min_amount=_float(method.get("min")),
+            max_amount=_float(method.get("max")), fee_percent=fee_percent,
+        ))
+    return limits
+
+
+async def _xrocket_limits(client: AsyncXRocket) -> List[Limit]:
+    limits = []
+    for currency in await client.withdrawal_fees():
+        for fee in currency.fees or []:
+            limits.append(Limit(
+                provider="xrocket", kind=LimitKinds.PAYOUT, currency=currency.code, network=fee.networkCode,
+                min_amount=currency.minWithdraw, fee_fixed=fee.feeWithdraw.fee if fee.feeWithdraw else None,
+            ))
+    return limits
+
+
+# Provider and kind that accept a currency they do not list, for example a fiat invoice that is paid in a listed
+# cryptocurrency. Such a request cannot be validated.
+UNLISTED_CURRENCIES = {("cryptomus", LimitKinds.PAYMENT)}
+
+LOADERS: List[Tuple[type, str, Callable[[Any], Awaitable[List[Limit]]]]] = [
+    (AsyncCryptomus, "cryptomus", _cryptomus_limits),
+    (AsyncFreeKassa, "freeKassa", _freekassa_limits),
+    (AsyncAaio, "aaio", _aaio_limits),
+    (AsyncCrystalPay, "crystalPay", _crystalpay_limits),
+    (AsyncXRocket, "xrocket", _xrocket_limits),
+]
+
+
+class Preflight:
+
+    def __init__(self, max_age: Optional[float] = 600.0) -> None:
+        """
+        Check payments and payouts against cached provider limits before sending them.
+
+        Limits, availability and commissions are loaded from the provider on first use and again when they
+        are older than max_age. A call outside the limits raises PreflightError, a subclass of BadRequest,
+        without a request to the provider.
+
+        Sources: Cryptomus list_of_services and list_of_services_payout, FreeKassa get_list_of_currencies and
+        get_list_of_currencies_for_withdrawal, Aaio get_order_methods and get_withdrawal_methods,
+        CrystalPay get_payment_methods and XRocket withdrawal_fees.
+
+        :param max_age: Optional. Seconds the limits are cached. Default is 600.
+        """
+        self.__max_age = max_age
+        self.__clients: Dict[str, Tuple[Any, Callable[[Any], Awaitable[List[Limit]]]]] = {}
+        self.__limits: Dict[str, Dict[Tuple[str, Optional[str], Optional[str], Optional[str]], Limit]] = {}
+        self.__updated_at: Dict[str, float] = {}
+        self.__loading: Dict[str, asyncio.Future] = {}
+
+    def add(self, client: Any) -> str:
+        """Add a provider.
+
+        :param client: AsyncCryptomus, AsyncFreeKassa, AsyncAaio, AsyncCrystalPay or AsyncXRocket.
+        :return: Provider name used in checks."""
+        for client_type, provider, load in LOADERS:
+            if isinstance(client, client_type):
+                self.__clients[provider] = (client, load)
+                return provider
+        raise ValueError(f'Preflight is not supported for {type(client).__name__}')
+
+    async def __load(self, provider: str) -> None:
+        client, load = self.__clients[provider]
+        limits = await load(client)
+        self.__limits[provider] = {
+            (limit.kind, limit.method, _upper(limit.currency), _upper(limit.network)): limit for limit in limits
+        }
+        self.__updated_at[provider] = time.monotonic()
+
+    async def refresh(self, provider: Optional[str] = None) -> None:
+        """Load the limits now.
+
+        :param provider: Optional. Provider name. Default is None (all providers)."""
+        providers = [provider] if provider else list(self.__clients)
+        for name in providers:
+            # Concurrent checks share one load instead of each loading the limits.
+            if name not in self.__loading:
+                self.__loading[name] = asyncio.ensure_future(self.__load(name))
+                self.__loading[name].add_done_callback(lambda _, name=name: self.__loading.pop(name, None))
+        await asyncio.gather(*[asyncio.shield(self.__loading[name]) for name in providers if name in self.__loading])
+
+    def find(self, provider: str, kind: str, method: Optional[str] = None, currency: Optional[str] = None,
+             network: Optional[str] = None) -> Optional[Limit]:
+        """Find the cached limit of a method, currency or network.
+
+        Without a network, the limits of all networks of the currency are merged into one with the lowest
+        minimum and the highest maximum of the available ones. Raises PreflightError if the limits of the
+        provider are loaded but none of them matches.
+
+        :return: Limit, or None if the limits of the provider are not loaded or the provider accepts a currency it does not list."""
+        limits = self.__limits.get(provider)
+        if limits is None:
+            return None
+        method = str(method) if method is not None else None
+        currency, network = _upper(currency), _upper(network)
+        for key in ((kind, method, currency, network), (kind, method, currency, None), (kind, method, None, None),
+                    (kind, None, currency, network), (kind, None, currency, None)):
+            if key in limits:
+                return limits[key]
+        if method is not None and currency is None:
+            # A method given without currency matches whatever currency it is priced in.
+            for (limit_kind, limit_method, _, _), limit in limits.items():
+                if limit_kind == kind and limit_method == method:
+                    return limit
+        if currency is not None and network is None:
+            found = [limit for (limit_kind, limit_method, limit_currency, _), limit in limits.items()
+                     if limit_kind == kind and limit_currency == currency and method in (None, limit_method)]
+            if found:
+                return self.__merge(found)
+            if (provider, kind) in UNLISTED_CURRENCIES and not any(
+                    limit_currency == currency for (_, _, limit_currency, _) in limits):
+                return None
+        described = ", ".join(f"{name} {value}" for name, value in
+                              (("method", method), ("currency", currency), ("network", network)) if value)
+        raise PreflightError(f"[{provider}] No {kind} method for {described or 'this request'}")
+
+    @staticmethod
+    def __merge(limits: List[Limit]) -> Limit:
+        """One limit that lets through an amount any of the available limits lets through. The fee is the highest."""
+        enabled = [limit for limit in limits if limit.enabled is not False] or limits
+        mins = [limit.min_amount for limit in enabled]
+        maxes = [limit.max_amount for limit in enabled]
+        first = enabled[0]
+        return Limit(
+            provider=first.provider, kind=first.kind, currency=first.currency,
+            method=first.method if all(limit.method == first.method for limit in enabled) else None,
+            enabled=first.enabled is not False,
+            min_amount=None if None in mins else min(mins),
+            max_amount=None if not all(maxes) else max(maxes),
+            fee_percent=max((limit.fee_percent for limit in enabled if limit.fee_percent is not None), default=None),
+            fee_fixed=max((limit.fee_fixed for limit in enabled if limit.fee_fixed is not None), default=None),
+        )
+
+    def validate(self, provider: str, kind: str, amount: Union[int, float], method: Optional[str] = None,
+                 currency: Optional[str] = None, network: Optional[str] = None) -> Optional[Limit]:
+        """Check an amount against the cached limits without loading them.
+
+        :return: Matched limit, or None if the limits of the provider are not loaded or the currency is not listed.
+        :raises PreflightError: If the method is unknown or disabled, or the amount is out of limits."""
+        limit = self.find(provider, kind, method, currency, network)
+        if limit is None:
+            return None
+        name = limit.method or " ".join(value for value in (limit.currency, limit.network) if value)
+        if limit.enabled is False:
+            raise PreflightError(f"[{provider}] {name} is not available for {kind}s now")
+        if limit.min_amount is not None and float(amount) < limit.min_amount:
+            raise PreflightError(f"[{provider}] Amount {amount} is less than the {name} minimum {limit.min_amount}")
+        if limit.max_amount and float(amount) > limit.max_amount:
+            raise PreflightError(f"[{provider}] Amount {amount} is more than the {name} maximum {limit.max_amount}")
+        return limit
+
+    async def __check(self, provider: str, kind: str, amount: Union[int, float], method: Optional[str],
+                      currency: Optional[str], network: Optional[str]) -> Optional[Limit]:
+        if provider not in self.__clients:
+            raise ValueError(f'Provider {provider} is not added')
+        updated_at = self.__updated_at.get(provider)
+        if updated_at is None or time.monotonic() - updated_at > self.__max_age:
+            await self.refresh(provider)
+        return self.validate(provider, kind, amount, method, currency, network)
+
+    async def check_payment(self, provider: str, amount: Union[int, float], method: Optional[str] = None,
+                            currency: Optional[str] = None, network: Optional[str] = None) -> Optional[Limit]:
+        """Check an invoice before creating it. Limits are loaded if they are missing or too old.
+
+        Example: limit = await preflight.check_payment("aaio", 100, method="cards_ru", currency="RUB"); fee = limit.fee(100)
+
+        :param provider: Provider name returned by add().
+        :param amount: Invoice amount.
+        :param method: Optional. Payment method: Aaio method code, FreeKassa currency ID or CrystalPay method name.
+        :param currency: Optional. Currency code.
+        :param network: Optional. Cryptomus network code.
+        :return: Matched limit, use limit.fee(amount) for the expected commission.
+        :raises PreflightError: If the method is unknown or disabled, or the amount is out of limits."""
+        return await self.__check(provider, LimitKinds.PAYMENT, amount, method, currency, network)
+
+    async def check_payout(self, provider: str, amount: Union[int, float], method: Optional[str] = None,
+                           currency: Optional[str] = None, network: Optional[str] = None) -> Optional[Limit]:
+        """Check a payout before creating it. Limits are loaded if they are missing or too old.
+
+        :param provider: Provider name returned by add().
+        :param amount: Payout amount.
+        :param method: Optional. Payout method: Aaio method code or FreeKassa currency ID.
+        :param currency: Optional. Currency code.
+        :param network: Optional. Cryptomus or XRocket network code.
+        :return: Matched limit, use limit.fee(amount) for the expected commission.
+        :raises PreflightError: If the method is unknown or disabled, or the amount is out of limits."""
+        return await self.__check(provider, LimitKinds.PAYOUT, amount, method, currency, network)
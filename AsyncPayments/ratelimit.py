@@ -0,0 +1,45 @@
+from typing import Optional
+
+import asyncio
+import time
+
+
+class RateLimiter:
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        """
+        Token bucket limiting how many requests are started per second.
+
+        :param rate: Requests per second.
+        :param burst: Optional. How many requests may start at once after an idle period. Default to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError('Rate must be greater than 0')
+        self.__rate = rate
+        self.__burst = burst or max(1, int(rate))
+        self.__tokens = float(self.__burst)
+        self.__updated_at = time.monotonic()
+        self.__lock: Optional[asyncio.Lock] = None
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__tokens = min(self.__burst, self.__tokens + (now - self.__updated_at) * self.__rate)
+        self.__updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be started."""
+        if self.__lock is None:
+            self.__lock = asyncio.Lock()
+        async with self.__lock:
+            self.__refill()
+            if self.__tokens < 1:
+                await asyncio.sleep((1 - self.__tokens) / self.__rate)
+                self.__refill()
+            self.__tokens -= 1
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
@@ -0,0 +1,172 @@
+from ..exceptions import RateUnavailable
+from ..cryptoBot import AsyncCryptoBot
+from ..crystalPay import AsyncCrystalPay
+from ..cryptomus import AsyncCryptomus
+from ..platega import AsyncPlatega
+from typing import Optional, Any, List, Dict, Tuple, Callable, Awaitable
+from collections import deque
+
+import asyncio
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+# A rate edge: 1 unit of the first currency costs rate units of the second one.
+Edge = Tuple[str, str, float]
+
+
+class RatesService:
+
+    def __init__(self, base: Optional[str] = "USD", interval: Optional[float] = 60.0,
+                 max_age: Optional[float] = 300.0) -> None:
+        """
+        Exchange rates of several providers, refreshed in the background and converted locally.
+
+        Every refresh loads the rates of all sources and prices every reachable currency in the base
+        currency, going through other currencies where there is no direct rate. convert() then only
+        takes two lookups and a division.
+
+        :param base: Optional. Currency all rates are triangulated through. Default is USD.
+        :param interval: Optional. Seconds between refreshes. Default is 60.
+        :param max_age: Optional. Rates older than this many seconds are not used. Default is 300.
+        """
+        self.__base = base.upper()
+        self.__interval = interval
+        self.__max_age = max_age
+        self.__sources: List[Tuple[str, Callable[[], Awaitable[List[Edge]]]]] = []
+        self.__edges: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self.__values: Dict[str, Tuple[float, float]] = {self.__base: (1.0, float("inf"))}
+        self.__task: Optional[asyncio.Task] = None
+
+    @property
+    def currencies(self) -> List[str]:
+        return list(self.__values)
+
+    def add(self, client: Any, currencies: Optional[List[str]] = None, base_currency: Optional[str] = "RUB",
+            pairs: Optional[List[Tuple[str, str]]] = None, payment_method: Optional[int] = None) -> None:
+        """Add a rates source.
+
+        Example: rates.add(crystalPay, currencies=["BTC", "USDT"], base_currency="RUB")
+
+        :param client: AsyncCryptoBot, AsyncCrystalPay, AsyncCryptomus or AsyncPlatega.
+        :param currencies: CrystalPay tickers or Cryptomus currencies to load rates for.
+        :param base_currency: Optional. CrystalPay base currency. Default is RUB.
+        :param pairs: Platega currency pairs, for example [("RUB", "USDT")].
+        :param payment_method: Platega payment method number.
+        :raises ValueError: If the client is not supported or its currencies or pairs are not given."""
+        if isinstance(client, (AsyncCrystalPay, AsyncCryptomus)) and not currencies:
+            raise ValueError(f'currencies are required for {type(client).__name__} rates')
+        if isinstance(client, AsyncPlatega) and not pairs:
+            raise ValueError('pairs are required for AsyncPlatega rates')
+        if isinstance(client, AsyncCryptoBot):
+            async def load() -> List[Edge]:
+                return [(rate.source, rate.target, rate.rate) for rate in await client.get_exchange_rates()
+                        if rate.is_valid and rate.rate]
+        elif isinstance(client, AsyncCrystalPay):
+            async def load() -> List[Edge]:
+                response = await client.get_tickers_rate(currencies, base_currency)
+                edges = []
+                for ticker, rate in (response.currencies or {}).items():
+                    price = rate.get("price") if isinstance(rate, dict) else rate
+                    if price:
+                        edges.append((ticker, response.base_currency or base_currency, float(price)))
+                return edges
+        elif isinstance(client, AsyncCryptomus):
+            async def load() -> List[Edge]:
+                lists = await asyncio.gather(*[client.exchange_rates_list(currency) for currency in currencies])
+                return [(rate.from_, rate.to, float(rate.course)) for rates in lists for rate in rates
+                        if rate.course and float(rate.course)]
+        elif isinstance(client, AsyncPlatega):
+            async def load() -> List[Edge]:
+                rates = await asyncio.gather(*[client.get_rates(payment_method, source, target) for source, target in pairs])
+                return [(rate.currencyFrom or source, rate.currencyTo or target, rate.rate)
+                        for (source, target), rate in zip(pairs, rates) if rate.rate]
+        else:
+            raise ValueError(f'Rates are not supported for {type(client).__name__}')
+        self.__sources.append((type(client).__name__, load))
+
+    async def refresh(self) -> None:
+        """Load the rates of all sources now. A failed source keeps its previous rates until they get too old."""
+        results = await asyncio.gather(*[load() for _, load in self.__sources], return_exceptions=True)
+        now = time.time()
+        for (name, _), edges in zip(self.__sources, results):
+            if isinstance(edges, BaseException):
+                logger.error("Rates of %s failed to load", name, exc_info=edges)
+                continue
+            for source, target, rate in edges:
+                self.__edges[(source.upper(), target.upper())] = (rate, now)
+        self.__rebuild()
+
+    def __rebuild(self) -> None:
+        now = time.time()
+        graph: Dict[str, List[Tuple[str, float, float]]] = {}
+        for (source, target), (rate, updated_at) in self.__edges.items():
+            if now - updated_at > self.__max_age:
+                # A stale direct rate must not hide a fresh path through other currencies.
+                continue
+            graph.setdefault(source, []).append((target, rate, updated_at))
+            graph.setdefault(target, []).append((source, 1 / rate, updated_at))
+        # Breadth-first from the base currency, so every currency is priced through the fewest conversions.
+        values = {self.__base: (1.0, float("inf"))}
+        queue = deque([self.__base])
+        while queue:
+            currency = queue.popleft()
+            value, updated_at = values[currency]
+            for neighbour, rate, edge_updated_at in sorted(graph.get(currency, []), key=lambda edge: -edge[2]):
+                if neighbour not in values:
+                    # 1 neighbour = 1 / rate currency = value / rate base.
+                    values[neighbour] = (value / rate, min(updated_at, edge_updated_at))
+                    queue.append(neighbour)
+        self.__values = values
+
+    def rate(self, source: str, target: str) -> float:
+        """Get the rate of source in target currency from the cache.
+
+        :raises RateUnavailable: If there is no rate or it is older than max_age."""
+        source, target = source.upper(), target.upper()
+        if source == target:
+            return 1.0
+        source_value = self.__values.get(source)
+        target_value = self.__values.get(target)
+        if source_value is None or target_value is None:
+            raise RateUnavailable(f'No rate for {source}/{target}')
+        if time.time() - min(source_value[1], target_value[1]) > self.__max_age:
+            raise RateUnavailable(f'Rate for {source}/{target} is older than {self.__max_age} seconds')
+        return source_value[0] / target_value[0]
+
+    def convert(self, amount: float, source: str, target: str) -> float:
+        """Convert an amount using cached rates.
+
+        :raises RateUnavailable: If there is no rate or it is older than max_age."""
+        return amount * self.rate(source, target)
+
+    async def __run(self) -> None:
+        while True:
+            await asyncio.sleep(self.__interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Rates refresh failed")
+
+    async def start(self) -> None:
+        """Load the rates once and keep refreshing them in a background task."""
+        if self.__task is None or self.__task.done():
+            await self.refresh()
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Stop refreshing."""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    async def __aenter__(self) -> "RatesService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
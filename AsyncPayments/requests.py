@@ -1,14 +1,28 @@
 import ssl
 import certifi
 from typing import Optional
-from aiohttp import ClientSession, TCPConnector, ClientResponse
+from aiohttp import ClientSession, TCPConnector, ClientResponse, ClientError
 from .exceptions.exceptions import BadRequest, RequestError
 
+import asyncio
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a request may succeed when sent again: network errors, timeouts, 5xx and 429 responses.
+
+    Rejections with another status, for example 400 with the error of the provider, are not transient."""
+    if isinstance(error, (ClientError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, RequestError):
+        return error.status is None or error.status >= 500 or error.status == 429
+    return False
+
 
 class RequestsClient:
 
     def __init__(self) -> None:
         self._session: Optional[ClientSession] = None
+        self._requests_in_flight: int = 0
 
     def _getsession(self) -> ClientSession:
 
@@ -33,11 +47,23 @@ class RequestsClient:
             await self._session.close()
             return response
     
+    async def _close_idle_session(self) -> None:
+        if self._requests_in_flight or self._session is None:
+            return
+        session, self._session = self._session, None
+        await session.close()
+
     async def _request(self, payment: str, method: str, url: str, **kwargs) -> dict:
         session = self._getsession()
+        self._requests_in_flight += 1
+        try:
+            return await self._send(session, payment, method, url, **kwargs)
+        finally:
+            self._requests_in_flight -= 1
+            await self._close_idle_session()
 
+    async def _send(self, session: ClientSession, payment: str, method: str, url: str, **kwargs) -> dict:
         async with session.request(method, url, **kwargs) as response:
-            await self._session.close()
             if response.status in [200, 201]:
                 if payment in ["ruKassa"]:
                     response = await response.json(content_type="text/html")
@@ -54,11 +80,13 @@ class RequestsClient:
                         return await self._checkexception(payment, response_json)
                     else:
                         raise RequestError(
-                            f"{payment}. Response status: {response.status}. Text: {await response.text()}"
+                            f"{payment}. Response status: {response.status}. Text: {await response.text()}",
+                            status=response.status,
                         )
                 except:
                     raise RequestError(
-                        f"{payment}. Response status: {response.status}. Text: {await response.text()}"
+                        f"{payment}. Response status: {response.status}. Text: {await response.text()}",
+                        status=response.status,
                     )
             return response
 
@@ -0,0 +1,2 @@
+from .stream import TransactionStream
+from .models import Transaction
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, Union, Any
+
+
+class Transaction(BaseModel):
+    provider: Optional[str] = None
+    id: Optional[str] = None
+    amount: Optional[Union[int, float]] = None
+    currency: Optional[str] = None
+    status: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    raw: Optional[Any] = None
@@ -0,0 +1,217 @@
+from ..cryptoBot import AsyncCryptoBot
+from ..cryptomus import AsyncCryptomus
+from ..crystalPay import AsyncCrystalPay
+from ..xrocket import AsyncXRocket
+from ..yoomoney import AsyncYoomoney
+from ..lolz import AsyncLolzteamMarketPayment
+from ..freeKassa import AsyncFreeKassa
+from .models import Transaction
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Union, List, AsyncIterator
+
+import asyncio
+import heapq
+import math
+
+
+# FreeKassa reports times without an offset in Moscow time.
+MOSCOW = timezone(timedelta(hours=3))
+
+
+def parse_timestamp(value: Union[str, int, float, None], tz: Optional[timezone] = timezone.utc) -> Optional[datetime]:
+    """Parse a provider timestamp (unix time or ISO 8601) into an aware UTC datetime. Naive values are in tz, UTC by default."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc)
+    value = value.strip().replace("Z", "+00:00")
+    if "." in value:
+        head, _, tail = value.partition(".")
+        digits = len(tail) - len(tail.lstrip("0123456789"))
+        value = f"{head}.{tail[:digits][:6].ljust(6, '0')}{tail[digits:]}"
+    date = datetime.fromisoformat(value)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=tz)
+    return date.astimezone(timezone.utc)
+
+
+def _to_float(value: Union[str, int, float, None]) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+class TransactionStream:
+
+    def __init__(self, *clients, date_from: Optional[datetime] = None, buffer_size: Optional[int] = 100) -> None:
+        """
+        Merged, time-ordered transaction history of several payment clients.
+
+        Each client's history is pulled concurrently into its own bounded buffer and heap-merged
+        into one sequence of Transaction records, newest first. A provider stops being read while
+        its buffer is full, so memory stays at buffer_size records per provider. Providers return
+        pages newest first, the records within a page are sorted here. Reading a provider stops
+        after the first page with records older than date_from.
+
+        Supported clients: AsyncCryptoBot, AsyncCryptomus, AsyncCrystalPay, AsyncXRocket, AsyncYoomoney,
+        AsyncLolzteamMarketPayment, AsyncFreeKassa.
+
+        :param clients: Payment clients to read the history of.
+        :param date_from: Optional. Only transactions created at or after this time. Naive datetimes are treated as UTC.
+        :param buffer_size: Optional. Maximum number of records buffered per provider. Default is 100.
+        """
+        self.__sources = [self.__get_source(client) for client in clients]
+        if date_from and date_from.tzinfo is None:
+            date_from = date_from.replace(tzinfo=timezone.utc)
+        self.__date_from = date_from
+        self.__buffer_size = buffer_size
+
+    def __get_source(self, client):
+        sources = {
+            AsyncCryptoBot: self.__crypto_bot,
+            AsyncCryptomus: self.__cryptomus,
+            AsyncCrystalPay: self.__crystal_pay,
+            AsyncXRocket: self.__xrocket,
+            AsyncYoomoney: self.__yoomoney,
+            AsyncLolzteamMarketPayment: self.__lolz,
+            AsyncFreeKassa: self.__free_kassa,
+        }
+        for client_type, source in sources.items():
+            if isinstance(client, client_type):
+                return lambda: source(client)
+        raise ValueError(f'Transaction history is not supported for {type(client).__name__}')
+
+    def __aiter__(self) -> AsyncIterator[Transaction]:
+        return self.__merge()
+
+    async def __merge(self) -> AsyncIterator[Transaction]:
+        queues = [asyncio.Queue(maxsize=self.__buffer_size) for _ in self.__sources]
+        tasks = [asyncio.create_task(self.__produce(source(), queue)) for source, queue in zip(self.__sources, queues)]
+        heap = []
+        try:
+            for index, queue in enumerate(queues):
+                await self.__push(heap, index, queue)
+            while heap:
+                _, index, transaction = heapq.heappop(heap)
+                yield transaction
+                await self.__push(heap, index, queues[index])
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __push(self, heap: list, index: int, queue: asyncio.Queue) -> None:
+        item = await queue.get()
+        if isinstance(item, BaseException):
+            raise item
+        if item is not None:
+            heapq.heappush(heap, (-item.timestamp.timestamp(), index, item))
+
+    async def __produce(self, source: AsyncIterator[List[Transaction]], queue: asyncio.Queue) -> None:
+        try:
+            async for page in source:
+                page = sorted((item for item in page if item.timestamp is not None),
+                              key=lambda item: item.timestamp, reverse=True)
+                fresh = [item for item in page if not self.__date_from or item.timestamp >= self.__date_from]
+                for transaction in fresh:
+                    await queue.put(transaction)
+                if len(fresh) < len(page):
+                    # Later pages are older still.
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            await queue.put(error)
+            return
+        await queue.put(None)
+
+    async def __crypto_bot(self, client: AsyncCryptoBot) -> AsyncIterator[List[Transaction]]:
+        offset, count = 0, 1000
+        while True:
+            invoices = await client.get_invoices(offset=offset, count=count)
+            if not invoices:
+                return
+            yield [Transaction(provider="cryptoBot", id=str(invoice.invoice_id), amount=_to_float(invoice.amount),
+                               currency=invoice.asset or invoice.fiat, status=invoice.status,
+                               timestamp=parse_timestamp(invoice.created_at), raw=invoice) for invoice in invoices]
+            if len(invoices) < count:
+                return
+            offset += count
+
+    async def __cryptomus(self, client: AsyncCryptomus) -> AsyncIterator[List[Transaction]]:
+        date_from = self.__date_from.strftime("%Y-%m-%d %H:%M:%S") if self.__date_from else None
+        cursor = None
+        while True:
+            history = await client.payment_history(date_from=date_from, cursor=cursor)
+            yield [Transaction(provider="cryptomus", id=payment.uuid, amount=_to_float(payment.amount),
+                               currency=payment.currency, status=payment.payment_status or payment.status,
+                               timestamp=parse_timestamp(payment.created_at), raw=payment)
+                   for payment in history.items or []]
+            cursor = history.paginate.nextCursor if history.paginate else None
+            if not cursor:
+                return
+
+    async def __crystal_pay(self, client: AsyncCrystalPay) -> AsyncIterator[List[Transaction]]:
+        period = 365
+        if self.__date_from:
+            period = max(1, math.ceil((datetime.now(timezone.utc) - self.__date_from).total_seconds() / 86400))
+        page, items = 1, 100
+        while True:
+            payments = await client.get_history_payments(page=page, items=items, period=period)
+            yield [Transaction(provider="crystalPay", id=payment.id, amount=_to_float(payment.initial_amount),
+                               currency=payment.amount_currency, status=payment.state,
+                               timestamp=parse_timestamp(payment.created_at), raw=payment) for payment in payments]
+            if len(payments) < items:
+                return
+            page += 1
+
+    async def __xrocket(self, client: AsyncXRocket) -> AsyncIterator[List[Transaction]]:
+        offset, limit = 0, 100
+        while True:
+            invoices = (await client.get_list_invoices(limit=limit, offset=offset)).results or []
+            yield [Transaction(provider="xrocket", id=invoice.id, amount=_to_float(invoice.amount),
+                               currency=invoice.currency, status=invoice.status,
+                               timestamp=parse_timestamp(invoice.created), raw=invoice) for invoice in invoices]
+            if len(invoices) < limit:
+                return
+            offset += limit
+
+    async def __yoomoney(self, client: AsyncYoomoney) -> AsyncIterator[List[Transaction]]:
+        date_from = self.__date_from.isoformat() if self.__date_from else None
+        start_record = None
+        while True:
+            history = await client.operation_history(date_from=date_from, start_record=start_record, records=100)
+            yield [Transaction(provider="yoomoney", id=operation.operation_id, amount=_to_float(operation.amount),
+                               currency=operation.amount_currency or "RUB", status=operation.status,
+                               timestamp=parse_timestamp(operation.datetime), raw=operation)
+                   for operation in history.operations or []]
+            if not history.next_record:
+                return
+            start_record = history.next_record
+
+    async def __lolz(self, client: AsyncLolzteamMarketPayment) -> AsyncIterator[List[Transaction]]:
+        date_from = self.__date_from.isoformat() if self.__date_from else None
+        page = 1
+        while True:
+            history = await client.get_history_payments(page=page, startDate=date_from)
+            transactions = []
+            for payment in (history.payments or {}).values():
+                amount = _to_float(payment.get("incoming_sum")) or -(_to_float(payment.get("outgoing_sum")) or 0)
+                transactions.append(Transaction(provider="lolz", id=str(payment.get("operation_id")), amount=amount,
+                                                currency="rub", status=payment.get("operation_type"),
+                                                timestamp=parse_timestamp(payment.get("operation_date")), raw=payment))
+            yield transactions
+            if not history.hasNextPage:
+                return
+            page += 1
+
+    async def __free_kassa(self, client: AsyncFreeKassa) -> AsyncIterator[List[Transaction]]:
+        date_from = self.__date_from.astimezone(MOSCOW).strftime("%Y-%m-%d %H:%M:%S") if self.__date_from else None
+        page, pages = 1, 1
+        while page <= pages:
+            orders = await client.get_orders(dateFrom=date_from, page=page)
+            yield [Transaction(provider="freeKassa", id=str(order.fk_order_id), amount=_to_float(order.amount),
+                               currency=order.currency, status=str(order.status),
+                               timestamp=parse_timestamp(order.date, MOSCOW), raw=order) for order in orders.orders or []]
+            pages = orders.pages or 1
+            page += 1
@@ -0,0 +1,4 @@
+from .receiver import WebhookReceiver
+from .dedup import DedupStore
+from .workqueue import WorkQueue, OverflowPolicies
+from .models import WebhookEvent, QueueStats
@@ -0,0 +1,146 @@
+from .models import WebhookEvent
+from typing import Optional, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import asyncio
+import hashlib
+import sqlite3
+import time
+
+
+class DedupStore:
+
+    def __init__(self, max_size: Optional[int] = 10000, ttl: Optional[float] = 86400.0,
+                 lease: Optional[float] = 60.0, path: Optional[str] = None) -> None:
+        """
+        Remember processed webhooks so that every status change of a payment is handled once.
+
+        A webhook is claimed before its handlers run. While they run the claim is a short lease, so a
+        retry of a webhook whose worker died is handled again after the lease ends. After the handlers
+        succeeded the claim is kept for ttl seconds, if they fail it is released at once.
+
+        Recent keys are kept in an in-memory LRU. With a path they are also stored in SQLite, so several
+        workers share them and they survive restarts.
+
+        :param max_size: Optional. Number of keys kept in memory. Default is 10000.
+        :param ttl: Optional. Seconds a handled webhook is remembered. Default is 86400 (one day).
+        :param lease: Optional. Seconds a claim lasts while its handlers run. Default is 60.
+        :param path: Optional. SQLite database file. Default is None (memory only).
+        """
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__lease = lease
+        self.__keys: "OrderedDict[str, float]" = OrderedDict()
+        self.__path = path
+        self.__connection: Optional[sqlite3.Connection] = None
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__claims = 0
+
+    @staticmethod
+    def key(event: WebhookEvent) -> str:
+        """Deduplication key of a webhook event: provider, payment ID and status.
+
+        Events without a payment ID use a hash of their data instead, so only identical webhooks are duplicates."""
+        payment_id = event.payment_id
+        if payment_id is None:
+            data = event.data.model_dump_json() if hasattr(event.data, "model_dump_json") else repr(event.data)
+            payment_id = "sha256-" + hashlib.sha256(data.encode()).hexdigest()
+        return f"{event.provider}:{payment_id}:{event.status}"
+
+    def __remember(self, key: str, expires_at: float) -> None:
+        self.__keys[key] = expires_at
+        self.__keys.move_to_end(key)
+        while len(self.__keys) > self.__max_size:
+            self.__keys.popitem(last=False)
+
+    def __connect(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            self.__connection = sqlite3.connect(self.__path, check_same_thread=False)
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS webhooks (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+            )
+            self.__connection.commit()
+        return self.__connection
+
+    def __claim_in_db(self, key: str, now: float, expires_at: float, purge: bool) -> bool:
+        connection = self.__connect()
+        with connection:
+            if purge:
+                connection.execute("DELETE FROM webhooks WHERE expires_at <= ?", (now,))
+            cursor = connection.execute(
+                "INSERT INTO webhooks (key, expires_at) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at WHERE webhooks.expires_at <= ?",
+                (key, expires_at, now),
+            )
+        return cursor.rowcount == 1
+
+    def __update_in_db(self, key: str, expires_at: Optional[float]) -> None:
+        connection = self.__connect()
+        with connection:
+            if expires_at is None:
+                connection.execute("DELETE FROM webhooks WHERE key = ?", (key,))
+            else:
+                connection.execute("UPDATE webhooks SET expires_at = ? WHERE key = ?", (expires_at, key))
+
+    async def __run_in_db(self, function, *args):
+        if self.__executor is None:
+            # One thread keeps all SQLite calls in order without blocking the event loop.
+            self.__executor = ThreadPoolExecutor(max_workers=1)
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, function, *args)
+
+    async def claim(self, key: Union[str, WebhookEvent]) -> bool:
+        """Claim a webhook before handling it.
+
+        :param key: Deduplication key or webhook event.
+        :return: True if the webhook should be handled, False if it is a duplicate."""
+        if isinstance(key, WebhookEvent):
+            key = self.key(key)
+        now = time.time()
+        expires_at = self.__keys.get(key)
+        if expires_at is not None and expires_at > now:
+            self.__keys.move_to_end(key)
+            return False
+        self.__remember(key, now + self.__lease)
+        if self.__path is None:
+            return True
+        self.__claims += 1
+        try:
+            claimed = await self.__run_in_db(self.__claim_in_db, key, now, now + self.__lease, self.__claims % 1000 == 0)
+        except Exception:
+            self.__keys.pop(key, None)
+            raise
+        if not claimed:
+            # Claimed by another worker, keep it in memory for the rest of the lease.
+            self.__remember(key, now + self.__lease)
+        return claimed
+
+    async def complete(self, key: Union[str, WebhookEvent]) -> None:
+        """Mark a claimed webhook as handled, so it is ignored for ttl seconds.
+
+        :param key: Deduplication key or webhook event."""
+        if isinstance(key, WebhookEvent):
+            key = self.key(key)
+        expires_at = time.time() + self.__ttl
+        self.__remember(key, expires_at)
+        if self.__path is not None:
+            await self.__run_in_db(self.__update_in_db, key, expires_at)
+
+    async def release(self, key: Union[str, WebhookEvent]) -> None:
+        """Release a claimed webhook whose handling failed, so a retry is handled again.
+
+        :param key: Deduplication key or webhook event."""
+        if isinstance(key, WebhookEvent):
+            key = self.key(key)
+        self.__keys.pop(key, None)
+        if self.__path is not None:
+            await self.__run_in_db(self.__update_in_db, key, None)
+
+    async def close(self) -> None:
+        """Close the SQLite database."""
+        if self.__connection is not None:
+            await self.__run_in_db(self.__connection.close)
+            self.__connection = None
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
@@ -0,0 +1,131 @@
+from ..exceptions import InvalidSignature
+from ..cryptoBot import AsyncCryptoBot
+from ..cryptoBot.models import Update
+from ..cryptomus import AsyncCryptomus
+from ..cryptomus.models import Webhook
+from ..crystalPay import AsyncCrystalPay
+from ..crystalPay.models import Callback as CrystalPayCallback
+from ..aaio import AsyncAaio
+from ..aaio.models import Notification as AaioNotification
+from ..freeKassa import AsyncFreeKassa
+from ..freeKassa.models import Notification as FreeKassaNotification
+from ..payok import AsyncPayOK
+from ..payok.models import Notification as PayOKNotification
+from ..xrocket import AsyncXRocket
+from ..xrocket.models import WebhookUpdate
+from ..apays import AsyncAPays
+from ..apays.models import Callback as APaysCallback
+from ..platega import AsyncPlatega
+from ..platega.models import Callback as PlategaCallback
+from .models import WebhookEvent
+from typing import Optional, Any, List, Tuple, Callable, Awaitable
+from aiohttp import web
+
+import json
+
+
+async def _read_json(request: web.Request) -> Tuple[bytes, dict]:
+    body = await request.read()
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        raise ValueError('Webhook body is not a JSON object')
+    return body, data
+
+
+async def _read_fields(request: web.Request) -> dict:
+    if request.content_type == "application/json":
+        return (await _read_json(request))[1]
+    return dict(await request.post())
+
+
+def _check(is_valid: bool) -> None:
+    if not is_valid:
+        raise InvalidSignature('Webhook signature does not match')
+
+
+def _to_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+async def parse_cryptobot(client: AsyncCryptoBot, request: web.Request) -> WebhookEvent:
+    body, data = await _read_json(request)
+    _check(client.check_webhook_signature(body, request.headers.get("crypto-pay-api-signature")))
+    update = Update(**data)
+    invoice = update.payload
+    return WebhookEvent(provider="cryptoBot", payment_id=_to_str(invoice.invoice_id if invoice else None),
+                        status=invoice.status if invoice else update.update_type, data=update)
+
+
+async def parse_xrocket(client: AsyncXRocket, request: web.Request) -> WebhookEvent:
+    body, data = await _read_json(request)
+    _check(client.check_webhook_signature(body, request.headers.get("rocket-pay-signature")))
+    update = WebhookUpdate(**data)
+    invoice = update.data
+    return WebhookEvent(provider="xrocket", payment_id=_to_str(invoice.id if invoice else None),
+                        status=invoice.status if invoice else update.type_, data=update)
+
+
+async def parse_cryptomus(client: AsyncCryptomus, request: web.Request) -> WebhookEvent:
+    _, data = await _read_json(request)
+    _check(client.check_webhook_signature(data))
+    webhook = Webhook(**data)
+    return WebhookEvent(provider="cryptomus", payment_id=webhook.uuid, status=webhook.status, data=webhook)
+
+
+async def parse_crystalpay(client: AsyncCrystalPay, request: web.Request) -> WebhookEvent:
+    _, data = await _read_json(request)
+    _check(client.check_webhook_signature(data.get("id"), data.get("signature")))
+    callback = CrystalPayCallback(**data)
+    return WebhookEvent(provider="crystalPay", payment_id=callback.id, status=callback.state, data=callback)
+
+
+async def parse_aaio(client: AsyncAaio, request: web.Request) -> WebhookEvent:
+    data = await _read_fields(request)
+    _check(client.check_webhook_signature(data))
+    notification = AaioNotification(**data)
+    # Aaio only notifies about successful payments.
+    return WebhookEvent(provider="aaio", payment_id=notification.order_id, status="paid", data=notification)
+
+
+async def parse_freekassa(client: AsyncFreeKassa, request: web.Request) -> WebhookEvent:
+    data = await _read_fields(request)
+    _check(client.check_webhook_signature(data))
+    notification = FreeKassaNotification(**data)
+    # FreeKassa only notifies about successful payments.
+    return WebhookEvent(provider="freeKassa", payment_id=notification.MERCHANT_ORDER_ID, status="paid", data=notification)
+
+
+async def parse_payok(client: AsyncPayOK, request: web.Request) -> WebhookEvent:
+    data = await _read_fields(request)
+    _check(client.check_webhook_signature(data))
+    notification = PayOKNotification(**data)
+    # PayOK only notifies about successful payments.
+    return WebhookEvent(provider="payok", payment_id=_to_str(notification.payment_id), status="paid", data=notification)
+
+
+async def parse_apays(client: AsyncAPays, request: web.Request) -> WebhookEvent:
+    data = await _read_fields(request)
+    _check(client.check_webhook_signature(data.get("order_id"), data.get("status"), data.get("sign")))
+    callback = APaysCallback(**data)
+    return WebhookEvent(provider="apays", payment_id=callback.order_id, status=callback.status, data=callback)
+
+
+async def parse_platega(client: AsyncPlatega, request: web.Request) -> WebhookEvent:
+    _check(client.check_webhook_signature(request.headers.get("X-MerchantId"), request.headers.get("X-Secret")))
+    _, data = await _read_json(request)
+    callback = PlategaCallback(**data)
+    return WebhookEvent(provider="platega", payment_id=callback.id, status=callback.status, data=callback)
+
+
+# Client type, provider name, parser and the response body the provider expects on success.
+ENDPOINTS: List[Tuple[type, str, Callable[[Any, web.Request], Awaitable[WebhookEvent]], str]] = [
+    (AsyncCryptoBot, "cryptoBot", parse_cryptobot, "OK"),
+    (AsyncXRocket, "xrocket", parse_xrocket, "OK"),
+    (AsyncCryptomus, "cryptomus", parse_cryptomus, "OK"),
+    (AsyncCrystalPay, "crystalPay", parse_crystalpay, "OK"),
+    (AsyncAaio, "aaio", parse_aaio, "OK"),
+    (AsyncFreeKassa, "freeKassa", parse_freekassa, "YES"),
+    (AsyncPayOK, "payok", parse_payok, "OK"),
+    (AsyncAPays, "apays", parse_apays, "OK"),
+    (AsyncPlatega, "platega", parse_platega, "OK"),
+]
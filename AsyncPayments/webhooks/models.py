@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, Any, List
+
+
+class WebhookEvent(BaseModel):
+    provider: Optional[str] = None
+    payment_id: Optional[str] = None
+    status: Optional[str] = None
+    data: Optional[Any] = None
+
+
+class QueueStats(BaseModel):
+    workers: Optional[int] = None
+    max_size: Optional[int] = None
+    depth: Optional[int] = None
+    shard_depths: Optional[List[int]] = None
+    max_depth: Optional[int] = None
+    accepted: Optional[int] = None
+    processed: Optional[int] = None
+    failed: Optional[int] = None
+    rejected: Optional[int] = None
+    dropped: Optional[int] = None
@@ -0,0 +1,173 @@
+from ..exceptions import InvalidSignature
+from .endpoints import ENDPOINTS
+from .models import WebhookEvent, QueueStats
+from .dedup import DedupStore
+from .workqueue import WorkQueue, OverflowPolicies
+from typing import Optional, Any, List, Dict, Tuple, Callable, Awaitable
+from aiohttp import web
+
+import asyncio
+
+
+class WebhookReceiver:
+
+    def __init__(self, dedup: Optional[DedupStore] = None, workers: Optional[int] = None,
+                 queue_size: Optional[int] = 1000, overflow: Optional[str] = OverflowPolicies.REJECT,
+                 on_error: Optional[Callable[[WebhookEvent, Exception], Awaitable]] = None) -> None:
+        """
+        Receive payment webhooks of several providers in one aiohttp application.
+
+        Every request is checked with the credentials of the client it was registered for, parsed into the
+        provider's model and passed to the async handlers as a WebhookEvent. Requests with a wrong signature
+        get 403, malformed requests get 400 and a failed handler gets 500, so the provider retries the webhook.
+
+        With workers set, a webhook is answered as soon as it is queued and the handlers run in a pool of
+        workers. Webhooks of the same payment are handled by one worker in the order they came. When the
+        queue is full the reject policy answers 503, so the provider retries later.
+
+        :param dedup: Optional. Store used to skip retried webhooks that were already handled. Default is None (no deduplication).
+        :param workers: Optional. Number of workers handling queued webhooks. Default is None (handle during the request).
+        :param queue_size: Optional. Maximum number of queued webhooks. Default is 1000.
+        :param overflow: Optional. What to do when the queue is full, one of OverflowPolicies. Default is reject.
+        :param on_error: Optional. Async callback called with the event and the error if a queued webhook fails.
+        """
+        self.__dedup = dedup
+        self.__on_error = on_error
+        self.__queue: Optional[WorkQueue] = None
+        if workers:
+            self.__queue = WorkQueue(self.__process, lambda item: (item[1].provider, item[1].payment_id),
+                                     workers, queue_size, overflow, self.__queue_error)
+        self.__routes: Dict[str, Tuple[Any, str, Callable, str]] = {}
+        self.__handlers: Dict[str, List[Callable[[WebhookEvent], Awaitable]]] = {}
+        self.__global_handlers: List[Callable[[WebhookEvent], Awaitable]] = []
+        self.__app: Optional[web.Application] = None
+
+    def add(self, client: Any, handler: Optional[Callable[[WebhookEvent], Awaitable]] = None,
+            path: Optional[str] = None) -> str:
+        """Receive webhooks of a provider.
+
+        Example: receiver.add(cryptoBot, on_cryptobot_payment, "/webhooks/cryptobot")
+
+        :param client: Provider API client: AsyncCryptoBot, AsyncXRocket, AsyncCryptomus, AsyncCrystalPay, AsyncAaio (with secretkey2), AsyncFreeKassa (with secretWord2), AsyncPayOK, AsyncAPays or AsyncPlatega.
+        :param handler: Optional. Async callback called with every WebhookEvent of this provider.
+        :param path: Optional. URL path of the webhook. Default is /webhooks/<provider name>.
+        :return: URL path of the webhook."""
+        for client_type, provider, parse, response in ENDPOINTS:
+            if isinstance(client, client_type):
+                break
+        else:
+            raise ValueError(f'Webhooks are not supported for {type(client).__name__}')
+        if provider in ("aaio", "freeKassa"):
+            # Their notifications are signed with a second secret that the client does not need otherwise,
+            # so a client without it is rejected here instead of failing on every webhook.
+            client.check_webhook_signature({})
+        path = path or f"/webhooks/{provider}"
+        if self.__app is not None:
+            self.__app.router.add_post(path, self.__route_handler(path))
+        self.__routes[path] = (client, provider, parse, response)
+        if handler is not None:
+            self.__handlers.setdefault(path, []).append(handler)
+        return path
+
+    def on_event(self, callback: Callable[[WebhookEvent], Awaitable]) -> Callable[[WebhookEvent], Awaitable]:
+        """Register an async callback called with webhook events of every provider. Can be used as a decorator."""
+        self.__global_handlers.append(callback)
+        return callback
+
+    @property
+    def stats(self) -> Optional[QueueStats]:
+        """Queue depth and counters, or None without workers."""
+        return self.__queue.stats if self.__queue is not None else None
+
+    @property
+    def app(self) -> web.Application:
+        """aiohttp application with a route for every added provider. Run it with aiohttp.web.run_app or mount it as a subapp."""
+        if self.__app is None:
+            self.__app = web.Application()
+            self.setup(self.__app)
+        return self.__app
+
+    def setup(self, app: web.Application) -> None:
+        """Add the webhook routes to an existing aiohttp application. Workers are started and stopped with the application."""
+        for path in self.__routes:
+            app.router.add_post(path, self.__route_handler(path))
+        if self.__queue is not None:
+            app.on_startup.append(lambda _: self.start())
+            app.on_cleanup.append(lambda _: self.stop())
+
+    def __route_handler(self, path: str) -> Callable[[web.Request], Awaitable[web.Response]]:
+        async def handler(request: web.Request) -> web.Response:
+            return await self.handle(path, request)
+        return handler
+
+    async def parse(self, path: str, request: web.Request) -> Tuple[WebhookEvent, str]:
+        """Check and parse a webhook request without calling the handlers.
+
+        :param path: URL path the provider was added with.
+        :param request: aiohttp request.
+        :return: Webhook event and the response body the provider expects."""
+        client, _, parse, response = self.__routes[path]
+        return await parse(client, request), response
+
+    async def dispatch(self, path: str, event: WebhookEvent) -> None:
+        """Call the handlers of a webhook event.
+
+        :param path: URL path the provider was added with.
+        :param event: Webhook event."""
+        for handler in self.__handlers.get(path, []) + self.__global_handlers:
+            await handler(event)
+
+    async def handle(self, path: str, request: web.Request) -> web.Response:
+        """Handle a webhook request received on the path a provider was added with."""
+        try:
+            event, response = await self.parse(path, request)
+        except InvalidSignature:
+            raise web.HTTPForbidden()
+        except (ValueError, TypeError):
+            raise web.HTTPBadRequest()
+        if self.__dedup is not None and not await self.__dedup.claim(event):
+            return web.Response(text=response)
+        if self.__queue is None:
+            await self.__process((path, event))
+            return web.Response(text=response)
+        try:
+            dropped = await self.__queue.put((path, event))
+        except asyncio.QueueFull:
+            if self.__dedup is not None:
+                await self.__dedup.release(event)
+            raise web.HTTPServiceUnavailable()
+        if dropped is not None and self.__dedup is not None:
+            await self.__dedup.release(dropped[1])
+        return web.Response(text=response)
+
+    async def __process(self, item: Tuple[str, WebhookEvent]) -> None:
+        path, event = item
+        try:
+            await self.dispatch(path, event)
+        except BaseException:
+            if self.__dedup is not None:
+                await self.__dedup.release(event)
+            raise
+        if self.__dedup is not None:
+            await self.__dedup.complete(event)
+
+    async def __queue_error(self, item: Tuple[str, WebhookEvent], error: Exception) -> None:
+        if self.__on_error is not None:
+            await self.__on_error(item[1], error)
+
+    async def start(self) -> None:
+        """Start the workers. Called on application startup when the receiver is set up with setup() or app."""
+        if self.__queue is not None:
+            self.__queue.start()
+
+    async def stop(self) -> None:
+        """Handle the queued webhooks and stop the workers."""
+        if self.__queue is not None:
+            await self.__queue.stop()
+
+    async def __aenter__(self) -> "WebhookReceiver":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
@@ -0,0 +1,124 @@
+from .models import QueueStats
+from typing import Optional, Any, List, Hashable, Callable, Awaitable
+
+import asyncio
+import zlib
+
+
+class OverflowPolicies:
+    REJECT: str = "reject"
+    DROP_OLDEST: str = "drop_oldest"
+    BLOCK: str = "block"
+
+
+class WorkQueue:
+
+    def __init__(self, handler: Callable[[Any], Awaitable], key: Callable[[Any], Hashable],
+                 workers: Optional[int] = 4, max_size: Optional[int] = 1000,
+                 overflow: Optional[str] = OverflowPolicies.REJECT,
+                 on_error: Optional[Callable[[Any, Exception], Awaitable]] = None) -> None:
+        """
+        Bounded queue drained by a pool of workers.
+
+        Items with the same key always go to the same worker, so they are handled one by one in the
+        order they were put. Every worker has its own queue of max_size / workers items.
+
+        :param handler: Coroutine function called with every item.
+        :param key: Returns the ordering key of an item, for example provider and payment ID.
+        :param workers: Optional. Number of workers. Default is 4.
+        :param max_size: Optional. Maximum number of queued items. Default is 1000.
+        :param overflow: Optional. What put() does when the worker queue is full, one of OverflowPolicies: raise asyncio.QueueFull (reject), drop the oldest queued item (drop_oldest) or wait (block). Default is reject.
+        :param on_error: Optional. Async callback called with the item and the error if the handler fails.
+        """
+        if overflow not in (OverflowPolicies.REJECT, OverflowPolicies.DROP_OLDEST, OverflowPolicies.BLOCK):
+            raise ValueError(f'Unknown overflow policy: {overflow}')
+        self.__handler = handler
+        self.__key = key
+        self.__workers = workers
+        self.__shard_size = max(1, max_size // workers)
+        self.__overflow = overflow
+        self.__on_error = on_error
+        self.__queues: List[asyncio.Queue] = []
+        self.__tasks: List[asyncio.Task] = []
+        self.__counters = dict.fromkeys(("accepted", "processed", "failed", "rejected", "dropped", "max_depth"), 0)
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self.__queues)
+
+    @property
+    def stats(self) -> QueueStats:
+        return QueueStats(workers=self.__workers, max_size=self.__shard_size * self.__workers, depth=self.depth,
+                          shard_depths=[queue.qsize() for queue in self.__queues], **self.__counters)
+
+    def __shard(self, item: Any) -> asyncio.Queue:
+        key = repr(self.__key(item)).encode()
+        # crc32 instead of hash(), so the shard of a key does not depend on PYTHONHASHSEED.
+        return self.__queues[zlib.crc32(key) % self.__workers]
+
+    async def put(self, item: Any) -> Optional[Any]:
+        """Queue an item.
+
+        :return: Item dropped to make room with the drop_oldest policy, otherwise None."""
+        if not self.__queues:
+            raise RuntimeError('WorkQueue is not started')
+        queue = self.__shard(item)
+        dropped = None
+        if queue.full():
+            if self.__overflow == OverflowPolicies.REJECT:
+                self.__counters["rejected"] += 1
+                raise asyncio.QueueFull()
+            if self.__overflow == OverflowPolicies.DROP_OLDEST:
+                dropped = queue.get_nowait()
+                queue.task_done()
+                self.__counters["dropped"] += 1
+        await queue.put(item)
+        self.__counters["accepted"] += 1
+        self.__counters["max_depth"] = max(self.__counters["max_depth"], self.depth)
+        return dropped
+
+    async def __work(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            try:
+                await self.__handler(item)
+                self.__counters["processed"] += 1
+            except Exception as error:
+                self.__counters["failed"] += 1
+                if self.__on_error is not None:
+                    try:
+                        await self.__on_error(item, error)
+                    except Exception:
+                        pass
+            finally:
+                queue.task_done()
+
+    def start(self) -> None:
+        """Start the workers."""
+        if self.__tasks:
+            return
+        if not self.__queues:
+            self.__queues = [asyncio.Queue(self.__shard_size) for _ in range(self.__workers)]
+        self.__tasks = [asyncio.create_task(self.__work(queue)) for queue in self.__queues]
+
+    async def join(self) -> None:
+        """Wait until all queued items are handled."""
+        await asyncio.gather(*[queue.join() for queue in self.__queues])
+
+    async def stop(self, drain: Optional[bool] = True) -> None:
+        """Stop the workers.
+
+        :param drain: Optional. Handle the queued items first. Default is True."""
+        if drain and self.__tasks:
+            await self.join()
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        self.__tasks = []
+
+    async def __aenter__(self) -> "WorkQueue":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
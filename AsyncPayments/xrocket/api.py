@@ -1,8 +1,10 @@
 from ..requests import RequestsClient
-from typing import Optional, List
+from typing import Optional, Union, List
 from .models import AppInfo, Transfer, Withdrawal, WithdrawalFees, MultiCheque, MultiChequesList, Invoice, InvoicesList, Currency, \
                     Subscription, SubscriptionsList, SubscriptionCheck, Subscriptions
 from urllib.parse import urlencode
+import hashlib
+import hmac
 
 
 class AsyncXRocket(RequestsClient):
@@ -30,6 +32,18 @@ class AsyncXRocket(RequestsClient):
     def check_values(self):
         if not self.__api_key:
             raise ValueError('No API key specified')
+
+    def check_webhook_signature(self, body: Union[bytes, str], signature: str) -> bool:
+        """Check the rocket-pay-signature header of a webhook.
+
+        :param body: Raw request body.
+        :param signature: Value of the rocket-pay-signature header.
+        :return: True if the webhook was sent by xRocket."""
+        if isinstance(body, str):
+            body = body.encode()
+        secret = hashlib.sha256(self.__api_key.encode()).digest()
+        expected = hmac.new(secret, body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
         
     async def get_app_info(self) -> AppInfo:
         """Returns information about your application.
@@ -391,4 +391,10 @@ class CountriesName:
     SB: str = "SB"
     TO: str = "TO"
     TV: str = "TV"
-    VU: str = "VU"
\ No newline at end of file
+    VU: str = "VU"
+
+
+class WebhookUpdate(BaseModel):
+    type_: Optional[str] = Field(alias="type", default=None)
+    timestamp: Optional[str] = None
+    data: Optional[Invoice] = None
@@ -1,2 +1,3 @@
 from .api import AsyncYoomoney
 from .authorize import Authorize
+from .tokens import MemoryTokenStore, JsonTokenStore
@@ -1,6 +1,6 @@
 from ..requests import RequestsClient
-from typing import Optional
-from .models import AccountInfo, OperationHistory, OperationDetails, RequestPayment, ProcessPayment
+from typing import Optional, Union, Dict, Iterable, AsyncIterator
+from .models import AccountInfo, Operation, OperationHistory, OperationDetails, RequestPayment, ProcessPayment
 from urllib.parse import urlencode
 
 
@@ -63,12 +63,46 @@ class AsyncYoomoney(RequestsClient):
             "till": date_till,
             "start_record": start_record,
             "records": records,
-            "details": details
+            "details": str(details).lower() if details is not None else None,
         }
         self._delete_empty_fields(params)
         response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=urlencode(params))
         return OperationHistory(**response)
     
+    async def iter_operation_history(self,
+                                     operation_type: Optional[str] = None,
+                                     label: Optional[str] = None,
+                                     date_from: Optional[str] = None,
+                                     date_till: Optional[str] = None,
+                                     records: Optional[int] = 100,
+                                     details: Optional[bool] = None) -> AsyncIterator[Operation]:
+        """Walk the whole transaction history page by page, following next_record. Operations are yielded lazily in reverse chronological order, only one page is kept in memory.
+
+        :param operation_type: Optional. A list of transaction types to display, separated by spaces: deposition, payment.
+        :param label: Optional. Filtering payments by label value.
+        :param date_from: Optional. Watermark. Iteration stops at operations earlier than this time.
+        :param date_till: Optional. Display operations up to the time point (operations earlier than 'till').
+        :param records: Optional. Page size. Valid values: 1 to 100, default: 100.
+        :param details: Optional. Show detailed operation details. Requires the operation-details permission.
+
+        Docs: https://yoomoney.ru/docs/wallet/user-account/operation-history"""
+        start_record = None
+        while True:
+            history = await self.operation_history(
+                operation_type=operation_type,
+                label=label,
+                date_from=date_from,
+                date_till=date_till,
+                start_record=start_record,
+                records=records,
+                details=details,
+            )
+            for operation in history.operations:
+                yield operation
+            if not history.next_record:
+                return
+            start_record = history.next_record
+
     async def operation_details(self, operation_id: Optional[str] = None) -> OperationDetails:
         """Allows you to obtain detailed information about an operation from the history.
         
@@ -142,6 +176,40 @@ class AsyncYoomoney(RequestsClient):
         response = await self._request(self.__payment_name, self.__post_method, url, headers=self.__headers, data=urlencode(params))
         return ProcessPayment(**response)
     
+    def __quick_pay_params(self, receiver: str, sum: float, quickpay_form: Optional[str], payment_type: Optional[str],
+                           label: Optional[str], success_url: Optional[str]) -> dict:
+        params = {
+            "receiver": receiver,
+            "sum": sum,
+            "quickpay-form": quickpay_form,
+            "paymentType": payment_type,
+            "label": label,
+            "successURL": success_url,
+        }
+        self._delete_empty_fields(params)
+        return params
+
+    def get_quick_pay_url(self,
+                          receiver: str,
+                          sum: float,
+                          quickpay_form: Optional[str] = "shop",
+                          payment_type: Optional[str] = "SB",
+                          label: Optional[str] = None,
+                          success_url: Optional[str] = None,
+                          ) -> str:
+        """Build a link to the payment form locally, without a request to YooMoney. Opening the link sends the form, just like quick_pay() does.
+
+        :param receiver: Number of the YooMoney wallet which money from senders is credited to.
+        :param sum: Transfer amount (the amount debited from the sender).
+        :param quickpay_form: Optional. Form type. Fixed value: button/shop.
+        :param payment_type: Optional. Payment method. Possible values: PC for a payment from a YooMoney wallet; AC for a payment from a bank card; SB.
+        :param label: Optional. The label that a site or app assigns to a certain transfer. For instance, a code or order identifier may be used for this label.
+        :param success_url: Optional. URL where the user is redirected after the transfer.
+
+        Docs: https://yoomoney.ru/docs/payment-buttons/using-api/forms"""
+        params = self.__quick_pay_params(receiver, sum, quickpay_form, payment_type, label, success_url)
+        return f"{self.API_HOST}/quickpay/confirm?" + urlencode(params)
+
     async def quick_pay(self,
                         receiver: str,
                         sum: float,
@@ -149,6 +217,7 @@ class AsyncYoomoney(RequestsClient):
                         payment_type: Optional[str] = "SB",
                         label: Optional[str] = None,
                         success_url: Optional[str] = None,
+                        local: Optional[bool] = False,
                         ) -> str:
         """A form is a set of fields with information about a transfer. You can place the form in your interface (for example, on a website or blog). When the sender clicks the button, the form data is sent to YuMoney and initiates a transfer instruction to your wallet.
         
@@ -158,19 +227,16 @@ class AsyncYoomoney(RequestsClient):
         :param payment_type: Optional. Payment method. Possible values: PC for a payment from a YooMoney wallet; AC for a payment from a bank card; SB.
         :param label: Optional. The label that a site or app assigns to a certain transfer. For instance, a code or order identifier may be used for this label.
         :param success_url: Optional. URL where the user is redirected after the transfer.
+        :param local: Optional. If True: the link is built locally, see get_quick_pay_url(). Default to False.
         
         Docs: https://yoomoney.ru/docs/payment-buttons/using-api/forms"""
+        if local:
+            return self.get_quick_pay_url(receiver, sum, quickpay_form, payment_type, label, success_url)
         url = "https://yoomoney.ru/quickpay/confirm"
-        params = {
-            "receiver": receiver,
-            "sum": sum,
-            "quickpay-form": quickpay_form,
-            "paymentType": payment_type,
-            "label": label,
-            "successURL": success_url,
-        }
-        self._delete_empty_fields(params)
-        response = await self._request(self.__payment_name_quick_pay, self.__post_method, url, headers=self.__headers, data=urlencode(params))
+        params = self.__quick_pay_params(receiver, sum, quickpay_form, payment_type, label, success_url)
+        # The payment form is public, the wallet token must not be sent with it.
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        response = await self._request(self.__payment_name_quick_pay, self.__post_method, url, headers=headers, data=urlencode(params))
         return response
     
     async def check_yoomoney_payment(self, label: str) -> bool:
@@ -182,4 +248,35 @@ class AsyncYoomoney(RequestsClient):
         if operations.operations:
             return operations.operations[0].label == label
         else:
-            return False
\ No newline at end of file
+            return False
+
+    async def check_yoomoney_payments(self,
+                                      labels: Union[Iterable[str], Dict[str, Union[int, float]]],
+                                      date_from: Optional[str] = None,
+                                      max_records: Optional[int] = 1000) -> Dict[str, bool]:
+        """
+        Checking many payments at once. Recent incoming operations are scanned page by page until every label is found, instead of one history request per label.
+
+        :param labels: Labels of operations. Pass a dict of label -> expected amount to also verify that at least this amount was received.
+        :param date_from: Optional. Only scan operations from this time, for example the creation time of the oldest pending order.
+        :param max_records: Optional. Maximum number of operations to scan. None - scan the whole history. Default is 1000.
+
+        :return: Dict of label -> True if paid, otherwise False."""
+        expected = labels if isinstance(labels, dict) else dict.fromkeys(labels)
+        if not expected:
+            return {}
+        result = dict.fromkeys(expected, False)
+        unresolved = set(expected)
+        scanned = 0
+        async for operation in self.iter_operation_history(operation_type="deposition", date_from=date_from):
+            scanned += 1
+            if operation.label in unresolved and operation.status == "success":
+                amount = expected[operation.label]
+                if amount is None or round(operation.amount or 0, 2) >= round(amount, 2):
+                    result[operation.label] = True
+                    unresolved.discard(operation.label)
+                    if not unresolved:
+                        break
+            if max_records is not None and scanned >= max_records:
+                break
+        return result
@@ -1,43 +1,141 @@
-from typing import List
+from typing import List, Dict, Optional, Union, Callable, Awaitable
 from ..requests import RequestsClient
 from ..exceptions import InvalidRequest, InvalidGrant, EmptyToken, UnauthorizedClient
+from .tokens import MemoryTokenStore
+from urllib.parse import urlencode, urlparse, quote
+from aiohttp import web
+
+import asyncio
+import secrets
+
 
 class Authorize(RequestsClient):
-    def __init__(self, client_id: str, redirect_uri: str, client_secret: str, scope: List[str]):
+    def __init__(self, client_id: str, redirect_uri: str, client_secret: str, scope: List[str],
+                 token_store: Optional[MemoryTokenStore] = None):
+        """
+        Get YooMoney access tokens with OAuth.
+
+        authorize() starts a small HTTP server on the port and path of redirect_uri, waits until the user
+        confirms access and YooMoney redirects to it, and exchanges the code for a token. Several
+        authorizations can run at once, the server is shared and stopped when the last one ends.
+
+        :param client_id: Your application ID.
+        :param redirect_uri: Redirect URI of your application, for example http://localhost:8080/yoomoney.
+        :param client_secret: Your application secret.
+        :param scope: Requested permissions, for example ["account-info", "operation-history"].
+        :param token_store: Optional. MemoryTokenStore or JsonTokenStore to keep tokens by key. Default to None.
+        """
         super().__init__()
         self.client_id = client_id
         self.redirect_uri = redirect_uri
         self.client_secret = client_secret
         self.scope = scope
-    
-    async def authorize(self):
-        url = "https://yoomoney.ru/oauth/authorize?client_id={client_id}&response_type=code" \
-              "&redirect_uri={redirect_uri}&scope={scope}".format(client_id=self.client_id,
-                                                                  redirect_uri=self.redirect_uri,
-                                                                  scope='%20'.join([str(elem) for elem in self.scope]),
-                                                                  )
+        self.token_store = token_store
+        self.__waiting: Dict[str, asyncio.Future] = {}
+        self.__runner: Optional[web.AppRunner] = None
+        self.__server_lock: Optional[asyncio.Lock] = None
+
+    def get_authorize_url(self, state: Optional[str] = None) -> str:
+        """Build the link where the user confirms access for your application.
+
+        Docs: https://yoomoney.ru/docs/wallet/using-api/authorization/request-access-token
+
+        :param state: Optional. Value passed back with the redirect to tell authorizations apart."""
+        params = {
+            "client_id": self.client_id,
+            "response_type": "code",
+            "redirect_uri": self.redirect_uri,
+            "scope": " ".join(str(elem) for elem in self.scope),
+            "state": state,
+        }
+        self._delete_empty_fields(params)
+        return "https://yoomoney.ru/oauth/authorize?" + urlencode(params, quote_via=quote)
+
+    async def __handle_redirect(self, request: web.Request) -> web.Response:
+        received = request.query.get("state", "")
+        future = None
+        for state, waiting in self.__waiting.items():
+            if secrets.compare_digest(state.encode(), received.encode()):
+                future = waiting
+        if future is None or future.done():
+            raise web.HTTPBadRequest(text="Unknown authorization request.")
+        if request.query.get("error"):
+            future.set_exception(InvalidRequest(request.query.get("error_description") or request.query["error"]))
+            return web.Response(text="Authorization was not completed. You can close this page.")
+        if not request.query.get("code"):
+            raise web.HTTPBadRequest(text="No authorization code.")
+        future.set_result(request.query["code"])
+        return web.Response(text="Authorization completed. You can close this page.")
+
+    async def __start_server(self, host: str, port: Optional[int]) -> None:
+        if self.__server_lock is None:
+            self.__server_lock = asyncio.Lock()
+        async with self.__server_lock:
+            if self.__runner is not None:
+                return
+            redirect = urlparse(self.redirect_uri)
+            app = web.Application()
+            app.router.add_get(redirect.path or "/", self.__handle_redirect)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            default_port = 443 if redirect.scheme == "https" else 80
+            try:
+                await web.TCPSite(runner, host, port or redirect.port or default_port).start()
+            except BaseException:
+                await runner.cleanup()
+                raise
+            self.__runner = runner
+
+    async def __stop_server(self) -> None:
+        async with self.__server_lock:
+            if self.__runner is not None and not self.__waiting:
+                await self.__runner.cleanup()
+                self.__runner = None
+
+    async def __catch_code(self, state: str, timeout: float, host: str, port: Optional[int],
+                           on_url: Optional[Callable[[str], Union[Awaitable, None]]] = None) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self.__waiting[state] = future
+        try:
+            await self.__start_server(host, port)
+            if on_url is not None:
+                result = on_url(self.get_authorize_url(state))
+                if asyncio.iscoroutine(result):
+                    await result
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            del self.__waiting[state]
+            await self.__stop_server()
 
+    async def wait_for_code(self, state: str, timeout: Optional[float] = 300, host: Optional[str] = "127.0.0.1",
+                            port: Optional[int] = None) -> str:
+        """Wait for the redirect to redirect_uri and return the temporary code.
+
+        :param state: State passed to get_authorize_url().
+        :param timeout: Optional. Seconds to wait for the user. Default to 300.
+        :param host: Optional. Address to listen on. Default to 127.0.0.1, use 0.0.0.0 behind a reverse proxy.
+        :param port: Optional. Port to listen on. Default to the port of redirect_uri."""
+        return await self.__catch_code(state, timeout, host, port)
+
+    async def get_token(self, code: str) -> str:
+        """Exchange a temporary code for an access token.
+
+        Docs: https://yoomoney.ru/docs/wallet/using-api/authorization/obtain-access-token
+
+        :param code: Temporary code from the redirect."""
+        url = "https://yoomoney.ru/oauth/token"
+        params = {
+            "code": code,
+            "client_id": self.client_id,
+            "grant_type": "authorization_code",
+            "redirect_uri": self.redirect_uri,
+            "client_secret": self.client_secret,
+        }
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded'
         }
-        response = await self._request_for_authorize_yoomoney("POST", url, headers=headers)
-        if response.status == 200:
-            print("Visit this website and confirm the application authorization request:")
-            print(response.url)
+        response = await self._request("yoomoney", "POST", url, headers=headers, data=urlencode(params))
 
-        code = str(input("Enter redirected url (https://yourredirect_uri?code=XXXXXXXXXXXXX) or just code: "))
-        try:
-            code = code[code.index("code=") + 5:].replace(" ","")
-        except:
-            pass
-
-        url = "https://yoomoney.ru/oauth/token?code={code}&client_id={client_id}&" \
-              "grant_type=authorization_code&redirect_uri={redirect_uri}&client_secret={client_secret}".format(code=str(code), client_id=self.client_id, 
-                                                                                                               redirect_uri=self.redirect_uri, 
-                                                                                                               client_secret=self.client_secret
-                                                                                                               )
-        response = await self._request("yoomoney", "POST", url, headers=headers)
-        
         if "error" in response:
             error = response["error"]
             if error == "invalid_request":
@@ -50,8 +148,40 @@ class Authorize(RequestsClient):
               "the token is expired, or this temporary token has already been issued " \
               "'access_token' (repeated request for an authorization token with the same temporary token).")
 
-        if response['access_token'] == "":
+        if not response.get('access_token'):
             raise EmptyToken("Response token is empty. Repeated request for an authorization token.")
 
-        print("Your access token:")
-        print(response['access_token'])
\ No newline at end of file
+        return response['access_token']
+
+    async def authorize(self, key: Optional[str] = None,
+                        on_url: Optional[Callable[[str], Union[Awaitable, None]]] = None,
+                        timeout: Optional[float] = 300, host: Optional[str] = "127.0.0.1",
+                        port: Optional[int] = None) -> str:
+        """Get an access token without blocking the event loop.
+
+        Example: token = await auth.authorize(user_id, on_url=lambda url: bot.send_message(user_id, url))
+
+        :param key: Optional. Key of the token in token_store, for example a user ID. If the store already has a token for it, that token is returned. Default to client_id.
+        :param on_url: Optional. Function or coroutine function called with the link the user has to open. Default to printing the link.
+        :param timeout: Optional. Seconds to wait for the user. Default to 300.
+        :param host: Optional. Address to listen on for the redirect. Default to 127.0.0.1.
+        :param port: Optional. Port to listen on for the redirect. Default to the port of redirect_uri.
+        :return: Access token."""
+        key = key or self.client_id
+        if self.token_store is not None:
+            token = await self.token_store.get(key)
+            if token:
+                return token
+
+        if on_url is None:
+            def on_url(url: str) -> None:
+                print("Visit this website and confirm the application authorization request:")
+                print(url)
+
+        # The link is sent only after the server listens, so the redirect cannot come too early.
+        code = await self.__catch_code(secrets.token_urlsafe(16), timeout, host, port, on_url)
+        token = await self.get_token(code)
+
+        if self.token_store is not None:
+            await self.token_store.set(key, token)
+        return token
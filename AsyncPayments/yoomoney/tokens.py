@@ -0,0 +1,50 @@
+from typing import Optional, Dict
+
+import json
+import os
+
+
+class MemoryTokenStore:
+
+    def __init__(self) -> None:
+        """Keeps access tokens in memory, by a key of your choice, for example a user ID."""
+        self._tokens: Dict[str, str] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._tokens.get(key)
+
+    async def set(self, key: str, token: str) -> None:
+        self._tokens[key] = token
+
+    async def delete(self, key: str) -> None:
+        self._tokens.pop(key, None)
+
+
+class JsonTokenStore(MemoryTokenStore):
+
+    def __init__(self, path: str) -> None:
+        """
+        Keeps access tokens in a JSON file. The file is rewritten atomically on every change and is
+        readable by its owner only.
+
+        :param path: Path to the JSON file. It is created on the first change.
+        """
+        super().__init__()
+        self.__path = path
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self._tokens = json.load(file)
+
+    def __save(self) -> None:
+        temp_path = f"{self.__path}.tmp"
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as file:
+            json.dump(self._tokens, file)
+        os.replace(temp_path, self.__path)
+
+    async def set(self, key: str, token: str) -> None:
+        await super().set(key, token)
+        self.__save()
+
+    async def delete(self, key: str) -> None:
+        await super().delete(key)
+        self.__save()